@@ -1,6 +1,18 @@
 CROSSREF_URL = "https://api.crossref.org/works"
 ENA_URL = "https://www.ebi.ac.uk/ena/browser/api/xml"
 ENA_SEARCH_URL = "https://www.ebi.ac.uk/ena/portal/api/search"
+ENA_FILEREPORT_URL = "https://www.ebi.ac.uk/ena/portal/api/filereport"
+# Columns of the ENA file report needed to list the FASTQ and BAM files of runs
+ENA_FILEREPORT_FIELDS = (
+    "run_accession",
+    "fastq_ftp",
+    "fastq_md5",
+    "fastq_bytes",
+    "submitted_ftp",
+    "submitted_md5",
+    "submitted_bytes",
+    "submitted_format",
+)
 ENA_FETCH = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
 
 # NCBI entrez urls
@@ -9,6 +21,9 @@ NCBI_SEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
 NCBI_SUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
 NCBI_FETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
 
+NCBI_HOST = "eutils.ncbi.nlm.nih.gov"
+ENA_HOST = "www.ebi.ac.uk"
+
 # TODO: replace all of the uses of these URLS to the general NCBI ones
 GSE_SEARCH_URL = (
     "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=gds&term="
@@ -28,3 +43,25 @@ FTP_GEO_SUPPL = "/suppl/"
 # ENCODE REST API links
 ENCODE_BIOSAMPLE_URL = "https://www.encodeproject.org/biosamples/"
 ENCODE_JSON = "/?format=json"
+
+# Concurrency and rate limiting
+# Number of threads shared by all fan-outs to downstream records, nested ones
+# included, so this bounds the number of extra threads fetching at once
+MAX_WORKERS = 8
+# Seconds to wait for a server to respond before giving up on a request, so
+# that a stalled connection does not hold on to a worker thread forever
+REQUEST_TIMEOUT = 60
+# Maximum number of accessions requested from the ENA XML API at once
+ENA_XML_BATCH_SIZE = 50
+# NCBI allows at most 3 requests per second without an API key
+NCBI_REQUESTS_PER_SECOND = 3
+# Requests per second sent to ENA, which throttles clients above 50/s. As many
+# may be sent back to back after an idle spell.
+ENA_REQUESTS_PER_SECOND = 10
+
+# On-disk response cache
+# Number of seconds a cached response is considered fresh
+CACHE_EXPIRE_AFTER = 86400
+# Longer freshness for responses from urls starting with these prefixes. ENA
+# XML records rarely change once they are published.
+CACHE_EXPIRE_AFTER_BY_URL = {ENA_URL: 7 * 86400}
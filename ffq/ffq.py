@@ -1,7 +1,5 @@
-import json
 import logging
 import re
-import time
 from urllib.parse import urlparse
 import warnings
 
@@ -13,7 +11,14 @@ from .utils import (
     get_gse_search_json,
     get_gsm_search_json,
     get_xml,
+    get_xml_many,
+    map_concurrently,
     get_encode_json,
+    ID_TAG_PARSER,
+    RUN_PARSER,
+    EXPERIMENT_PARSER,
+    PROJECT_PARSER,
+    SAMPLE_PARSER,
     get_samples_from_study,
     ncbi_link,
     ncbi_search,
@@ -29,9 +34,10 @@ from .utils import (
     gsm_to_platform,
     gse_to_gsms,
     srx_to_srrs,
+    get_file_reports,
     get_files_metadata_from_run,
     parse_url,
-    parse_ncbi_fetch_fasta,
+    parse_ncbi_fetch_fasta_all,
     ena_fetch,
     parse_bioproject,
 )
@@ -40,11 +46,11 @@ warnings.filterwarnings("ignore", category=UserWarning, module="bs4")
 
 logger = logging.getLogger(__name__)
 
-RUN_PARSER = re.compile(r"(SRR.+)|(ERR.+)|(DRR.+)")
-EXPERIMENT_PARSER = re.compile(r"(SRX.+)|(ERX.+)|(DRX.+)")
-PROJECT_PARSER = re.compile(r"(SRP.+)|(ERP.+)|(DRP.+)")
-SAMPLE_PARSER = re.compile(r"(SRS.+)|(ERS.+)|(DRS.+)")
-DOI_PARSER = re.compile("^10.\d{4,9}\/[-._;()\/:A-Z0-9]+")  # noqa
+DOI_PARSER = re.compile(r"^10.\d{4,9}/[-._;()/:A-Z0-9]+", re.IGNORECASE)
+# Letters an accession starts with, which must be followed by a digit
+ACCESSION_PREFIX_PARSER = re.compile(r"^([A-Z]+)\d")
+# Run and sample attributes whose values are converted to integers
+NUMERIC_ATTRIBUTES = frozenset(["ENA-SPOT-COUNT", "ENA-BASE-COUNT"])
 
 
 # TODO evenetually create an accession class
@@ -61,7 +67,8 @@ def validate_accessions(accessions, search_types):
         accession = input_accession.upper()
 
         valid = False
-        prefix = re.findall(r"(\D+).+", accession)[0]
+        prefix_match = ACCESSION_PREFIX_PARSER.match(accession)
+        prefix = prefix_match.group(1) if prefix_match else None
 
         if prefix in search_types:
             valid = True
@@ -81,24 +88,28 @@ def validate_accessions(accessions, search_types):
     return IDs
 
 
-def parse_run(soup):
+def parse_run(soup, file_report=None):
     """Given a BeautifulSoup object representing a run, parse out relevant
     information.
 
     :param soup: a BeautifulSoup object representing a run
     :type soup: bs4.BeautifulSoup
 
+    :param file_report: the run's row of the ENA file report, if it was
+                        already fetched, defaults to `None`
+    :type file_report: dict, optional
+
     :return: a dictionary containing run information
     :rtype: dict
     """
-    accession = soup.find("PRIMARY_ID", text=RUN_PARSER).text
-    experiment = (
-        soup.find("PRIMARY_ID", text=EXPERIMENT_PARSER).text
-        if soup.find("PRIMARY_ID", text=EXPERIMENT_PARSER)
-        else soup.find("EXPERIMENT_REF")["accession"]
-    )
+    accession = soup.find("PRIMARY_ID", string=RUN_PARSER).text
+    experiment_parsed = soup.find("PRIMARY_ID", string=EXPERIMENT_PARSER)
+    if experiment_parsed:
+        experiment = experiment_parsed.text
+    else:
+        experiment = soup.find("EXPERIMENT_REF")["accession"]
 
-    study_parsed = soup.find("ID", text=PROJECT_PARSER)
+    study_parsed = soup.find("ID", string=PROJECT_PARSER)
     if study_parsed:
         study = study_parsed.text
     else:
@@ -107,7 +118,7 @@ def parse_run(soup):
         #         'ENA search...'
         #     )
         study = search_ena_run_study(accession)
-    sample_parsed = soup.find("ID", text=SAMPLE_PARSER)
+    sample_parsed = soup.find("ID", string=SAMPLE_PARSER)
     if sample_parsed:
         sample = sample_parsed.text
     else:
@@ -122,18 +133,30 @@ def parse_run(soup):
 
     for attr in soup.find_all("RUN_ATTRIBUTE"):
         try:
-            tag = attr.find("TAG").text
-            value = attr.find("VALUE").text
+            # TAG and VALUE are direct children, so don't search any deeper
+            tag = attr.find("TAG", recursive=False).text
+            value = attr.find("VALUE", recursive=False).text
+            if tag in NUMERIC_ATTRIBUTES and value.isdigit():
+                value = int(value)
             attributes[tag] = value
         except:  # noqa
             pass
-    if attributes:
-        try:
-            attributes["ENA-SPOT-COUNT"] = int(attributes["ENA-SPOT-COUNT"])
-            attributes["ENA-BASE-COUNT"] = int(attributes["ENA-BASE-COUNT"])
-        except:  # noqa
-            pass
-    ftp_files = get_files_metadata_from_run(soup)
+    if file_report is None:
+        # The ENA file reports and the NCBI alternative links are independent,
+        # so fetch them at the same time
+        ftp_files, alt_links_soup = map_concurrently(
+            lambda fetch: fetch(),
+            [
+                lambda: get_files_metadata_from_run(soup),
+                lambda: ncbi_fetch_fasta(accession, "sra"),
+            ],
+            max_workers=2,
+        )
+    else:
+        # The file report was already fetched, so only the alternative links
+        # need a request
+        ftp_files = get_files_metadata_from_run(soup, file_report)
+        alt_links_soup = ncbi_fetch_fasta(accession, "sra")
     # print(ftp_files)
     # ftp_files = [file for file in ftp_files if accession in file['url']]
     # print(ftp_files)
@@ -146,67 +169,25 @@ def parse_run(soup):
     # file['filetype'] = filetype
     # file['filenumber'] = fileno
 
-    alt_links_soup = ncbi_fetch_fasta(accession, "sra")
-
-    aws_links = parse_ncbi_fetch_fasta(alt_links_soup, "AWS")
-    aws_results = []
-    for url in aws_links:
-        if accession in url:
-            filetype, fileno = parse_url(url)
-            aws_results.append(
-                {
-                    "accession": accession,
-                    "filename": url.split("/")[-1],
-                    "filetype": filetype,
-                    "filesize": None,
-                    "filenumber": fileno,
-                    "md5": None,
-                    "urltype": "aws",
-                    "url": url,
-                }
-            )
-
-    gcp_links = parse_ncbi_fetch_fasta(alt_links_soup, "GCP")
-    gcp_results = []
-    for url in gcp_links:
-        if accession in url:
-            filetype, fileno = parse_url(url)
-            gcp_results.append(
-                {
-                    "accession": accession,
-                    "filename": url.split("/")[-1],
-                    "filetype": filetype,
-                    "filesize": None,
-                    "filenumber": fileno,
-                    "md5": None,
-                    "urltype": "gcp",
-                    "url": url,
-                }
-            )
-
-    ncbi_links = parse_ncbi_fetch_fasta(alt_links_soup, "NCBI")
-    ncbi_results = []
-    for url in ncbi_links:
-        if accession in url:
-            filetype, fileno = parse_url(url)
-            ncbi_results.append(
-                {
-                    "accession": accession,
-                    "filename": url.split("/")[-1],
-                    "filetype": filetype,
-                    "filesize": None,
-                    "filenumber": fileno,
-                    "md5": None,
-                    "urltype": "ncbi",
-                    "url": url,
-                }
-            )
-    files = {
-        "ftp": ftp_files,
-        "aws": aws_results,
-        "gcp": gcp_results,
-        "ncbi": ncbi_results,
-    }
+    alt_links = parse_ncbi_fetch_fasta_all(alt_links_soup)
+    files = {"ftp": ftp_files}
+    for server, urltype in (("AWS", "aws"), ("GCP", "gcp"), ("NCBI", "ncbi")):
+        files[urltype] = []
+        for url in alt_links.get(server, []):
+            if accession in url:
+                filetype, fileno = parse_url(url)
+                files[urltype].append(
+                    {
+                        "accession": accession,
+                        "filename": url.rsplit("/", 1)[-1],
+                        "filetype": filetype,
+                        "filesize": None,
+                        "filenumber": fileno,
+                        "md5": None,
+                        "urltype": urltype,
+                        "url": url,
+                    }
+                )
     return {
         "accession": accession,
         "experiment": experiment,
@@ -228,27 +209,24 @@ def parse_sample(soup):
     :return: a dictionary containing sample information
     :rtype: dict
     """
-    accession = soup.find("PRIMARY_ID", text=SAMPLE_PARSER).text
+    accession = soup.find("PRIMARY_ID", string=SAMPLE_PARSER).text
     title = soup.find("TITLE").text
     organism = soup.find("SCIENTIFIC_NAME").text
     sample_attribute = soup.find_all("SAMPLE_ATTRIBUTE")
     try:
-        attributes = {
-            attr.find("TAG").text: attr.find("VALUE").text for attr in sample_attribute
-        }
+        # TAG and VALUE are direct children, so don't search any deeper
+        attributes = {}
+        for attr in sample_attribute:
+            tag = attr.find("TAG", recursive=False).text
+            value = attr.find("VALUE", recursive=False).text
+            if tag in NUMERIC_ATTRIBUTES and value.isdigit():
+                value = int(value)
+            attributes[tag] = value
     except:  # noqa
         attributes = ""
-    if attributes:
-        try:
-            attributes["ENA-SPOT-COUNT"] = int(attributes["ENA-SPOT-COUNT"])
-            attributes["ENA-BASE-COUNT"] = int(attributes["ENA-BASE-COUNT"])
-        except:  # noqa
-            pass
     try:
 
-        experiment = soup.find(
-            re.compile(r"PRIMARY_ID|ID"), text=EXPERIMENT_PARSER
-        ).text
+        experiment = soup.find(ID_TAG_PARSER, string=EXPERIMENT_PARSER).text
         # try:
         #     experiment = soup.find('ID', text=EXPERIMENT_PARSER).text
         # except:  # noqa
@@ -293,10 +271,11 @@ def parse_experiment_with_run(soup, level):
     :return: a dictionary containing experiment information
     :rtype: dict
     """
-    accession = soup.find("PRIMARY_ID", text=EXPERIMENT_PARSER).text
+    accession = soup.find("PRIMARY_ID", string=EXPERIMENT_PARSER).text
     title = soup.find("TITLE").text
-    platform = soup.find("INSTRUMENT_MODEL").find_parent().name
-    instrument = soup.find("INSTRUMENT_MODEL").text
+    instrument_model = soup.find("INSTRUMENT_MODEL")
+    platform = instrument_model.parent.name
+    instrument = instrument_model.text
 
     experiment = {
         "accession": accession,
@@ -308,12 +287,29 @@ def parse_experiment_with_run(soup, level):
         # Returns all of the runs associated with an experiment
         runs = srx_to_srrs(accession)
         if len(runs) == 1:
-            logger.warning(f"There is 1 run for {accession}")
+            logger.warning("There is 1 run for %s", accession)
 
         else:
-            logger.warning(f"There are {len(runs)} runs for {accession}")
-
-        runs = {run: ffq_run(run) for run in runs}
+            logger.warning("There are %s runs for %s", len(runs), accession)
+
+        # Fetch the XML of all runs in batches, and the file report of all runs
+        # at once, then parse the runs concurrently, as they are independent of
+        # each other
+        run_soups = get_xml_many(runs)
+        file_reports = get_file_reports(accession)
+        runs = dict(
+            zip(
+                runs,
+                map_concurrently(
+                    lambda run: ffq_run(
+                        run,
+                        soup=run_soups.get(run),
+                        file_report=file_reports.get(run),
+                    ),
+                    runs,
+                ),
+            )
+        )
 
         experiment.update({"runs": runs})
         return experiment
@@ -331,23 +327,22 @@ def parse_study(soup):
     :return: a dictionary containing study information
     :rtype: dict
     """
-    accession = soup.find("PRIMARY_ID", text=PROJECT_PARSER).text
+    accession = soup.find("PRIMARY_ID", string=PROJECT_PARSER).text
     title = soup.find("STUDY_TITLE").text
-    abstract = soup.find("STUDY_ABSTRACT").text if soup.find("STUDY_ABSTRACT") else ""
+    abstract_parsed = soup.find("STUDY_ABSTRACT")
+    abstract = abstract_parsed.text if abstract_parsed else ""
     return {"accession": accession, "title": title, "abstract": abstract}
 
 
-def parse_gse_search(soup):
-    """Given a BeautifulSoup object representing a geo study, parse out relevant
-    information.
+def parse_gse_search(data):
+    """Given the JSON of a geo study search, parse out relevant information.
 
-    :param soup: a BeautifulSoup object representing a study
-    :type soup: bs4.BeautifulSoup
+    :param data: the parsed JSON of a geo study search
+    :type data: dict
 
     :return: a dictionary containing geo study unique identifier based on a search
     :rtype: dict
     """
-    data = json.loads(soup.text)
     if data["esearchresult"]["idlist"]:
         accession = data["esearchresult"]["querytranslation"].split("[")[0]
         geo_id = data["esearchresult"]["idlist"][-1]
@@ -356,41 +351,50 @@ def parse_gse_search(soup):
         raise InvalidAccession("Provided GSE accession is invalid")
 
 
-def parse_gse_summary(soup):
-    """Given a BeautifulSoup object representing a geo study identifier, parse out relevant
+def parse_gse_summary(data):
+    """Given the JSON summary of a geo study identifier, parse out relevant
     information.
 
-    :param soup: a BeautifulSoup object representing a study
-    :type soup: bs4.BeautifulSoup
+    :param data: the parsed JSON summary of a geo study
+    :type data: dict
 
-    :return: a dictionary containing summary of geo study information
+    :return: a dictionary containing summary of geo study information, or
+             `None` if the study has no SRA relation
     :rtype: dict
     """
-    data = json.loads(soup.text)
-
     geo_id = data["result"]["uids"][-1]
 
     relations = data["result"][f"{geo_id}"]["extrelations"]
-    for value in relations:
-        if value["relationtype"] == "SRA":  # may have many samples?
-            sra = value
+    # Use the last SRA relation, if there are many
+    sra = next(
+        (value for value in reversed(relations) if value["relationtype"] == "SRA"),
+        None,
+    )
 
     if sra:
         srp = sra["targetobject"]
         return {"accession": srp}
 
 
-def ffq_run(accession, level=0):  # noqa
+def ffq_run(accession, level=0, soup=None, file_report=None):  # noqa
     """Fetch Run information.
 
     :param accession: run accession (SRR, ERR or DRR)
     :type accession: str
 
+    :param soup: a BeautifulSoup object of the run's XML, if it was already
+                 fetched, defaults to `None`
+    :type soup: bs4.BeautifulSoup, optional
+
+    :param file_report: the run's row of the ENA file report, if it was
+                        already fetched, defaults to `None`
+    :type file_report: dict, optional
+
     :return: dictionary of run information
     :rtype: dict
     """
-    logger.info(f"Parsing run {accession}")
-    run = parse_run(get_xml(accession))
+    logger.info("Parsing run %s", accession)
+    run = parse_run(soup if soup is not None else get_xml(accession), file_report)
     return run
 
 
@@ -408,17 +412,22 @@ def ffq_study(accession, level=None):
              returned by `ffq_sample`.
     :rtype: dict
     """
-    logger.info(f"Parsing Study {accession}")
+    logger.info("Parsing Study %s", accession)
     study = parse_study(get_xml(accession))
     if level is None or level != 1:
-        try:
+        if level is not None:
             level -= 1
-        except:  # noqa
-            pass
-        logger.info(f"Getting Sample for {accession}")
+        logger.info("Getting Sample for %s", accession)
         sample_ids = get_samples_from_study(accession)
-        logger.warning(f"There are {str(len(sample_ids))} samples for {accession}")
-        samples = [ffq_sample(sample_id, level) for sample_id in sample_ids]
+        logger.warning("There are %s samples for %s", len(sample_ids), accession)
+        # Fetch the XML of all samples in batches before parsing them
+        sample_soups = get_xml_many(sample_ids)
+        samples = map_concurrently(
+            lambda sample_id: ffq_sample(
+                sample_id, level, soup=sample_soups.get(sample_id)
+            ),
+            sample_ids,
+        )
         study.update({"samples": {sample["accession"]: sample for sample in samples}})
         return study
     else:
@@ -441,25 +450,21 @@ def ffq_gse(accession, level=None):
              returned by `ffq_gsm`.
     :rtype: dict
     """
-    logger.info(f"Parsing GEO {accession}")
+    logger.info("Parsing GEO %s", accession)
     gse = parse_gse_search(get_gse_search_json(accession))
-    logger.info(f"Finding supplementary files for GEO {accession}")
-    time.sleep(1)
+    logger.info("Finding supplementary files for GEO %s", accession)
     supp = geo_to_suppl(accession, "GSE")
     if len(supp) > 0:
         gse.update({"supplementary_files": supp})
     else:
-        logger.info(f"No supplementary files found for {accession}")
+        logger.info("No supplementary files found for %s", accession)
     gse.pop("geo_id")
     if level is None or level != 1:
-        try:
+        if level is not None:
             level -= 1
-        except:  # noqa
-            pass
-        time.sleep(1)
         gsm_ids = gse_to_gsms(accession)
-        logger.warning(f"There are {str(len(gsm_ids))} samples for {accession}")
-        gsms = [ffq_gsm(gsm_id, level) for gsm_id in gsm_ids]
+        logger.warning("There are %s samples for %s", len(gsm_ids), accession)
+        gsms = map_concurrently(lambda gsm_id: ffq_gsm(gsm_id, level), gsm_ids)
         gse.update({"geo_samples": {sample["accession"]: sample for sample in gsms}})
         return gse
     else:
@@ -482,23 +487,20 @@ def ffq_gsm(accession, level=None):
              returned by `ffq_sample`.
     :rtype: dict
     """
-    logger.info(f"Parsing GSM {accession}")
+    logger.info("Parsing GSM %s", accession)
     gsm = get_gsm_search_json(accession)
-    logger.info(f"Finding supplementary files for GSM {accession}")
-    time.sleep(1)
+    logger.info("Finding supplementary files for GSM %s", accession)
     supp = geo_to_suppl(accession, "GSM")
     if supp:
         gsm.update({"supplementary_files": supp})
     else:
-        logger.info(f"No supplementary files found for {accession}")
+        logger.info("No supplementary files found for %s", accession)
 
     gsm.update(gsm_to_platform(accession))
     if level is None or level != 1:
-        try:
+        if level is not None:
             level -= 1
-        except:  # noqa
-            pass
-        logger.info(f"Getting sample for {accession}")
+        logger.info("Getting sample for %s", accession)
         srs = gsm_id_to_srs(gsm.pop("geo_id"))
         if srs:
             sample = ffq_sample(srs, level)
@@ -524,12 +526,12 @@ def ffq_experiment(accession, level=None):
              returned by `ffq_run`.
     :rtype: dict
     """
-    logger.info(f"Parsing Experiment {accession}")
+    logger.info("Parsing Experiment %s", accession)
     experiment = parse_experiment_with_run(get_xml(accession), level)
     return experiment
 
 
-def ffq_sample(accession, level=None):
+def ffq_sample(accession, level=None, soup=None):
     """Fetch Sample information.
 
     :param accession: sample accession (SRS, ERS or DRS)
@@ -538,20 +540,22 @@ def ffq_sample(accession, level=None):
     :param l: positive integer representing how many downstream accession levels should be fetched.
     :type l: int
 
+    :param soup: a BeautifulSoup object of the sample's XML, if it was already
+                 fetched, defaults to `None`
+    :type soup: bs4.BeautifulSoup, optional
+
     :return: dictionary of sample information. The dictionary contains a
              'runs' key, which is a dictionary of all the runs in the study, as
              returned by `ffq_run`.
     :rtype: dict
     """
-    logger.info(f"Parsing sample {accession}")
-    xml_sample = get_xml(accession)
+    logger.info("Parsing sample %s", accession)
+    xml_sample = soup if soup is not None else get_xml(accession)
     sample = parse_sample(xml_sample)
     if level is None or level != 1:
-        try:
+        if level is not None:
             level -= 1
-        except:  # noqa
-            pass
-        logger.info(f"Getting Experiment for {accession}")
+        logger.info("Getting Experiment for %s", accession)
         exp_id = sample["experiments"]
         if not exp_id:
             try:
@@ -559,22 +563,20 @@ def ffq_sample(accession, level=None):
                 id = get_gsm_search_json(alias)["geo_id"]
                 exp_id = ncbi_summary("gds", id)[id]["extrelations"][0]["targetobject"]
             except:  # noqa
-                logger.warning(f"No Experiment found for {accession}")
-        if "," in exp_id:
-            exp_ids = exp_id.split(",")
-            experiments = [ffq_experiment(exp_id, level) for exp_id in exp_ids]
-            sample.update(
-                {
-                    "experiments": [
-                        {experiment["accession"]: experiment}
-                        for experiment in experiments
-                    ]
+                logger.warning("No Experiment found for %s", accession)
+        # A sample may belong to several experiments, given as a comma
+        # separated list
+        exp_ids = [exp_id.strip() for exp_id in exp_id.split(",")]
+        experiments = map_concurrently(
+            lambda exp_id: ffq_experiment(exp_id, level), exp_ids
+        )
+        sample.update(
+            {
+                "experiments": {
+                    experiment["accession"]: experiment for experiment in experiments
                 }
-            )
-            return sample
-        else:
-            experiment = ffq_experiment(exp_id, level)
-            sample.update({"experiments": {experiment["accession"]: experiment}})
+            }
+        )
         return sample
     else:
         return sample
@@ -591,7 +593,7 @@ def ffq_encode(accession, level=0):
     :return: dictionary of ENCODE id metadata.
     :rtype: dict
     """
-    logger.info(f"Parsing {accession}")
+    logger.info("Parsing %s", accession)
     encode = parse_encode_json(accession, get_encode_json(accession))
     return encode
 
@@ -626,10 +628,8 @@ def ffq_biosample(accession, level=None):
     # sample = soup.find('id', text=SAMPLE_PARSER).text
     soup = get_xml(accession)
     sample = soup.SAMPLE.attrs["accession"]
-    try:
-        level = level - 1
-    except:  # noqa
-        pass
+    if level is not None:
+        level -= 1
     sample_data = ffq_sample(sample, level)
     return {"accession": accession, "samples": sample_data}
 
@@ -660,23 +660,27 @@ def ffq_doi(doi, level=0):  # noqa
     if parsed.scheme:
         doi = parsed.path.strip("/")
 
-    logger.info(f"Searching for DOI '{doi}'")
+    logger.info("Searching for DOI '%s'", doi)
     paper = get_doi(doi)
     title = paper["title"][0]
 
-    logger.info(f"Searching for Study SRP with title '{title}'")
+    logger.info("Searching for Study SRP with title '%s'", title)
     study_accessions = search_ena_title(title)
 
     if study_accessions:
         logger.info(
-            f'Found {len(study_accessions)} studies that match this title: {", ".join(study_accessions)}'
+            "Found %s studies that match this title: %s",
+            len(study_accessions),
+            ", ".join(study_accessions),
+        )
+        return map_concurrently(
+            lambda accession: ffq_study(accession, None), study_accessions
         )
-        return [ffq_study(accession, None) for accession in study_accessions]
 
     # If not study with the title is found, search Pubmed, which can be linked
     # to a GEO accession.
     logger.warning(
-        ("No studies found with the given title. " f"Searching Pubmed for DOI '{doi}'")
+        "No studies found with the given title. Searching Pubmed for DOI '%s'", doi
     )
     pubmed_ids = ncbi_search("pubmed", doi)
 
@@ -686,12 +690,16 @@ def ffq_doi(doi, level=0):  # noqa
         raise Exception(f'{len(pubmed_ids)} match the DOI: {", ".join(pubmed_ids)}')
 
     pubmed_id = pubmed_ids[0]
-    logger.info(f"Searching for GEO record linked to Pubmed ID '{pubmed_id}'")
-    geo_ids = ncbi_link("pubmed", "gds", pubmed_id)
+    logger.info("Searching for GEO and SRA records linked to Pubmed ID '%s'", pubmed_id)
+    # SRA records are only used when there are no GEO records, but looking up
+    # both at the same time saves a round trip in that case
+    geo_ids, sra_ids = map_concurrently(
+        lambda db: ncbi_link("pubmed", db, pubmed_id), ["gds", "sra"]
+    )
     if geo_ids:
         # Convert these geo ids to GSE accessions
         gses = geo_ids_to_gses(geo_ids)
-        logger.info(f'Found {len(gses)} GEO Accessions: {", ".join(gses)}')
+        logger.info("Found %s GEO Accessions: %s", len(gses), ", ".join(gses))
         if len(gses) != len(geo_ids):
             raise Exception(
                 (
@@ -699,32 +707,34 @@ def ffq_doi(doi, level=0):  # noqa
                     f"records: expected {len(geo_ids)} but found {len(gses)}"
                 )
             )
-        # Sleep for 1sec because NCBI has rate-limiting to 3 requests/sec
-        time.sleep(1)
-        return [ffq_gse(accession) for accession in gses]
+        # NCBI requests are rate-limited by the shared limiter, so the GSEs
+        # can be fetched concurrently
+        return map_concurrently(ffq_gse, gses)
 
-    # If the pubmed id is not linked to any GEO record, search for SRA records
+    # If the pubmed id is not linked to any GEO record, use the SRA records
     logger.warning(
         (
-            f"No GEO records are linked to the Pubmed ID '{pubmed_id}'. "
-            "Searching for SRA record linked to this Pubmed ID."
-        )
+            "No GEO records are linked to the Pubmed ID '%s'. "
+            "Using SRA records linked to this Pubmed ID."
+        ),
+        pubmed_id,
     )
-    time.sleep(1)
-    sra_ids = ncbi_link("pubmed", "sra", pubmed_id)
     if sra_ids:
         srrs = sra_ids_to_srrs(sra_ids)
-        logger.warning(f"Found {len(srrs)} run accessions.")
-        runs = [ffq_run(accession) for accession in srrs]
+        logger.warning("Found %s run accessions.", len(srrs))
+        # Fetch the XML of all runs in batches before parsing them
+        run_soups = get_xml_many(srrs)
+        runs = map_concurrently(lambda run: ffq_run(run, soup=run_soups.get(run)), srrs)
 
         # Group runs by project to keep things consistent.
         studies = {}
         for run in runs:
-            study = run["study"].copy()  # Prevent recursive dict
-            # get the study accession if exists and add the run to the runs
-            studies.setdefault(study["accession"], study).setdefault("runs", {})[
-                run["accession"]
-            ] = run
+            # parse_run gives the study accession
+            study = studies.get(run["study"])
+            if study is None:
+                study = {"accession": run["study"], "runs": {}}
+                studies[run["study"]] = study
+            study["runs"][run["accession"]] = run
 
         return [v for k, v in studies.items()]
     else:
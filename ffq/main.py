@@ -5,7 +5,7 @@ import os
 import sys
 
 from ffq.exceptions import CliError, InvalidAccession, FfqException, FailToFetchData
-from ffq.utils import findkey
+from ffq.utils import enable_disk_cache, findkey
 
 from . import __version__
 from .ffq import (
@@ -131,6 +131,18 @@ def main():
         help="Split output into separate files by accession  (`-o` is a directory)",  # noqa
         action="store_true",
     )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="CACHE_DIR",
+        help="Cache responses on disk in CACHE_DIR and reuse them in later runs",
+        type=str,
+        required=False,
+    )
+    parser.add_argument(
+        "--clear-cache",
+        help="Remove the responses cached in CACHE_DIR before fetching",
+        action="store_true",
+    )
     parser.add_argument(
         "--verbose", help="Print debugging information", action="store_true"
     )
@@ -179,6 +191,11 @@ def run_ffq(args):
                 f"{args.t} is not a valide type. TYPES can be one of {', '.join(SEARCH_TYPES)}"
             )
 
+    if args.clear_cache and not args.cache_dir:
+        raise CliError("`--cache-dir` must be provided when using `--clear-cache`")
+    if args.cache_dir:
+        enable_disk_cache(args.cache_dir, clear=args.clear_cache)
+
     # "clean" the provided ids
     accessions = validate_accessions(args.IDs, SEARCH_TYPES)
 
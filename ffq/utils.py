@@ -1,28 +1,48 @@
+import hashlib
 import json
+import os
 import re
+import socket
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from urllib.parse import urlparse
 
 import requests
-from ftplib import FTP
+from ftplib import FTP, all_errors as ftp_errors, error_perm
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from frozendict import frozendict
 import logging
 
-from .exceptions import InvalidAccession, ConnectionError, BadData
+from .exceptions import InvalidAccession, ConnectionError, BadData, FfqException
 from .config import (
+    CACHE_EXPIRE_AFTER,
+    CACHE_EXPIRE_AFTER_BY_URL,
     CROSSREF_URL,
     ENA_SEARCH_URL,
+    ENA_FILEREPORT_URL,
+    ENA_FILEREPORT_FIELDS,
     ENA_URL,
     ENA_FETCH,
+    ENA_HOST,
+    ENA_REQUESTS_PER_SECOND,
+    ENA_XML_BATCH_SIZE,
     GSE_SEARCH_URL,
     GSE_SUMMARY_URL,
     GSE_SEARCH_TERMS,
     GSE_SUMMARY_TERMS,
+    MAX_WORKERS,
     NCBI_FETCH_URL,
+    NCBI_HOST,
     NCBI_LINK_URL,
     NCBI_SEARCH_URL,
     NCBI_SUMMARY_URL,
+    NCBI_REQUESTS_PER_SECOND,
+    REQUEST_TIMEOUT,
     FTP_GEO_URL,
     FTP_GEO_SAMPLE,
     FTP_GEO_SERIES,
@@ -31,52 +51,400 @@ from .config import (
     ENCODE_JSON,
 )
 
-RUN_PARSER = re.compile(r"(SRR.+)|(ERR.+)|(DRR.+)")
+# Anchored, so that non-matching strings are rejected on their first character
+RUN_PARSER = re.compile(r"^[SED]RR\d")
+EXPERIMENT_PARSER = re.compile(r"^[SED]RX\d")
+PROJECT_PARSER = re.compile(r"^[SED]RP\d")
+SAMPLE_PARSER = re.compile(r"^[SED]RS\d")
 GSE_PARSER = re.compile(r"Series\t\tAccession: (?P<accession>GSE[0-9]+)\t")
 SRP_PARSER = re.compile(r'Study acc="(?P<accession>SRP[0-9]+)"')
 SRR_PARSER = re.compile(r'Run acc="(?P<accession>SRR[0-9]+)"')
-EXPERIMENT_PARSER = re.compile(r"(SRX.+)|(ERX.+)|(DRX.+)")
-SAMPLE_PARSER = re.compile(r"(SRS.+)|(ERS.+)|(DRS.+)")
+ID_TAG_PARSER = re.compile(r"PRIMARY_ID|ID")
+ACCESSION_BASE_PARSER = re.compile(r"^.*?(?=[0-9])")
 
 logger = logging.getLogger(__name__)
 
 
+class RateLimiter:
+    """Thread-safe token bucket that lets at most `rate` calls start every
+    second on average, and up to `capacity` calls at once after an idle spell.
+
+    :param rate: maximum number of calls per second
+    :type rate: float
+    :param capacity: maximum number of calls that may start back to back,
+                     defaults to `1`
+    :type capacity: int, optional
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call is allowed to start."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # A negative balance reserves a slot for this call in the future
+            self.tokens -= 1
+            delay = -self.tokens / self.rate
+        if delay > 0:
+            time.sleep(delay)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that turns on TCP keepalive for its connections, so that
+    pooled connections stay usable while ffq is busy with other hosts.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+# Shared session so that connections (and TLS handshakes) are reused between
+# requests to the same host, including across threads. The adapter keeps a
+# separate pool for each host, so switching between ENA and NCBI does not
+# close the connections to the other one.
+SESSION = requests.Session()
+for prefix in ("https://", "http://"):
+    SESSION.mount(
+        prefix,
+        KeepAliveAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                # Retries wait for the Retry-After header of a 429 or 503
+                # if the server sends one
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        ),
+    )
+
+# Rate limiters shared by all threads, keyed by host
+RATE_LIMITERS = {
+    NCBI_HOST: RateLimiter(NCBI_REQUESTS_PER_SECOND),
+    ENA_HOST: RateLimiter(ENA_REQUESTS_PER_SECOND, ENA_REQUESTS_PER_SECOND),
+    FTP_GEO_URL: RateLimiter(NCBI_REQUESTS_PER_SECOND),
+}
+
+
+def rate_limited_get(url, *args, **kwargs):
+    """GET request through the shared session that first waits on the rate
+    limiter of the host the url points to, if there is one. Requests time out
+    after `REQUEST_TIMEOUT` seconds unless a `timeout` is given.
+
+    :param url: url to fetch
+    :type url: str
+
+    :return: the response
+    :rtype: requests.Response
+    """
+    limiter = RATE_LIMITERS.get(urlparse(url).netloc)
+    if limiter:
+        limiter.wait()
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    return SESSION.get(url, *args, **kwargs)
+
+
+# Threads shared by all calls to map_concurrently, including nested ones. A slot
+# is taken for every item handed to the pool and given back when it is done, so
+# the pool always has an idle thread for each submitted item.
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+WORKER_SLOTS = threading.BoundedSemaphore(MAX_WORKERS)
+
+
+def run_in_slot(function, item):
+    """Call `function` with `item`, then give back the worker slot taken for it."""
+    try:
+        return function(item)
+    finally:
+        WORKER_SLOTS.release()
+
+
+def map_concurrently(function, items, max_workers=MAX_WORKERS):
+    """Apply `function` to each of the items in a pool of threads. Used to fetch
+    independent accessions at the same time instead of one after the other.
+
+    All calls share one pool of `MAX_WORKERS` threads, so nested calls run
+    concurrently too without the total number of threads growing with the
+    depth of the fan-out. Items are handed to the pool while it has idle
+    threads, and the calling thread applies `function` to the rest itself
+    instead of waiting for one.
+
+    :param function: function to call with each item
+    :type function: function
+    :param items: items to call the function with
+    :type items: list
+    :param max_workers: maximum number of pool threads used by this call,
+                        defaults to `MAX_WORKERS`
+    :type max_workers: int, optional
+
+    :return: the results, in the same order as the items
+    :rtype: list
+    """
+    items = list(items)
+    results = [None] * len(items)
+    futures = {}
+    for index, item in enumerate(items):
+        # The last item is always applied by the calling thread, which would
+        # otherwise just wait for the others
+        if (
+            index < len(items) - 1
+            and len(futures) < max_workers
+            and WORKER_SLOTS.acquire(blocking=False)
+        ):
+            futures[index] = EXECUTOR.submit(run_in_slot, function, item)
+        else:
+            results[index] = function(item)
+    for index, future in futures.items():
+        results[index] = future.result()
+    return results
+
+
+# Names of the files created by DiskCache: the SHA-1 of the request, the
+# suffix of a response's ETag, and the suffix of the temporary file of an
+# interrupted write
+CACHE_FILE_PARSER = re.compile(r"^[0-9a-f]{40}\.txt(\.etag)?(\.\d+\.\d+)?$")
+
+
+class DiskCache:
+    """Cache of response texts on disk, with one file per request.
+
+    :param directory: directory to store the responses in
+    :type directory: str
+    :param expire_after: number of seconds a stored response is fresh for
+    :type expire_after: int
+    """
+
+    def __init__(self, directory, expire_after=CACHE_EXPIRE_AFTER):
+        self.directory = os.path.expanduser(directory)
+        self.expire_after = expire_after
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        """Path of the file the response for `key` is stored in."""
+        return os.path.join(
+            self.directory, hashlib.sha1(key.encode()).hexdigest() + ".txt"
+        )
+
+    def get(self, key, expire_after=None):
+        """Return the stored response for `key`, or None if there is no fresh one.
+
+        :param key: key the response was stored under
+        :type key: str
+        :param expire_after: number of seconds the response is fresh for,
+                             defaults to the expiry of the cache
+        :type expire_after: int, optional
+
+        :return: the stored response, or None
+        :rtype: str
+        """
+        if expire_after is None:
+            expire_after = self.expire_after
+        path = self.path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > expire_after:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get_stale(self, key):
+        """Return the stored response for `key` along with its ETag, however old
+        it is, or None if there is no response with an ETag. Used to revalidate
+        expired responses with the server instead of downloading them again.
+
+        :param key: key the response was stored under
+        :type key: str
+
+        :return: the stored response and its ETag, or None
+        :rtype: tuple
+        """
+        path = self.path(key)
+        try:
+            with open(f"{path}.etag", "r", encoding="utf-8") as f:
+                etag = f.read()
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read(), etag
+        except OSError:
+            return None
+
+    def touch(self, key):
+        """Mark the stored response for `key` as fresh again."""
+        os.utime(self.path(key))
+
+    def clear(self):
+        """Remove all stored responses. Only files named like the ones the cache
+        creates are removed, so other files in the directory are left alone.
+        """
+        for filename in os.listdir(self.directory):
+            if CACHE_FILE_PARSER.match(filename):
+                os.remove(os.path.join(self.directory, filename))
+
+    def write(self, path, text):
+        """Write `text` to `path`. The text is written to a temporary file first
+        so that concurrent readers never see a partially written file.
+        """
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def set(self, key, text, etag=None):
+        """Store the response for `key`, and its ETag if the server sent one."""
+        path = self.path(key)
+        # The ETag of the previous response is removed before the new response is
+        # written, and the new ETag only after it, so that an ETag is never
+        # paired with a response it does not belong to
+        try:
+            os.remove(f"{path}.etag")
+        except FileNotFoundError:
+            pass
+        self.write(path, text)
+        if etag:
+            self.write(f"{path}.etag", etag)
+
+
+# Disabled unless `enable_disk_cache` is called
+DISK_CACHE = None
+
+
+def enable_disk_cache(directory, expire_after=CACHE_EXPIRE_AFTER, clear=False):
+    """Persist the responses of `cached_get` on disk, so that they are reused
+    across invocations.
+
+    :param directory: directory to store the responses in
+    :type directory: str
+    :param expire_after: number of seconds a stored response is fresh for
+    :type expire_after: int
+    :param clear: whether to remove the responses already stored in the
+                  directory, defaults to `False`
+    :type clear: bool, optional
+    """
+    global DISK_CACHE
+    DISK_CACHE = DiskCache(directory, expire_after)
+    if clear:
+        DISK_CACHE.clear()
+
+
 @lru_cache()
 def cached_get(*args, **kwargs):
-    """Cached version of requests.get.
+    """Cached version of requests.get. Responses are kept in memory, and also
+    on disk if `enable_disk_cache` was called.
 
     :return: text of response
     :rtype: str
     """
-    response = requests.get(*args, **kwargs)
+    key = repr((args, sorted(kwargs.items())))
+    request_kwargs = kwargs
+    stale = None
+    if DISK_CACHE is not None:
+        expire_after = next(
+            (
+                seconds
+                for prefix, seconds in CACHE_EXPIRE_AFTER_BY_URL.items()
+                if args[0].startswith(prefix)
+            ),
+            None,
+        )
+        text = DISK_CACHE.get(key, expire_after)
+        if text is not None:
+            return text
+        # An expired response can be reused if the server confirms it has not
+        # changed since
+        stale = DISK_CACHE.get_stale(key)
+        if stale is not None:
+            headers = dict(kwargs.get("headers") or {})
+            headers["If-None-Match"] = stale[1]
+            request_kwargs = dict(kwargs, headers=headers)
+
+    response = rate_limited_get(*args, **request_kwargs)
+    if stale is not None and response.status_code == 304:
+        DISK_CACHE.touch(key)
+        return stale[0]
     try:
         response.raise_for_status()
     except requests.HTTPError as exception:
-        if hasattr(exception, "getcode") and exception.getcode() == 429:
+        if exception.response is not None and exception.response.status_code == 429:
             raise ConnectionError(
                 "429 Client Error: Too Many Requests. Please try again later"
             )
         else:
-            logger.error(f"{exception}")
+            logger.error(exception)
             raise InvalidAccession("Provided accession is invalid")
     text = response.text
     if not text:
         raise BadData(f"No metadata found in {args[0]}")
     else:
-        return response.text
+        if DISK_CACHE is not None:
+            DISK_CACHE.set(key, text, response.headers.get("ETag"))
+        return text
 
 
+@lru_cache(maxsize=1024)
 def get_xml(accession):
     """Given an accession, retrieve the XML from ENA.
 
+    The parsed XML is memoized, as the same study, sample or experiment is
+    often reached from many runs. Callers must not modify the returned object.
+
     :param accession: an accession
     :type accession: str
 
     :return: a BeautifulSoup object of the parsed XML
     :rtype: bs4.BeautifulSoup
     """
+    return BeautifulSoup(cached_get(f"{ENA_URL}/{accession}"), features="lxml-xml")
+
 
-    return BeautifulSoup(cached_get(f"{ENA_URL}/{accession}"), "xml")
+def get_xml_many(accessions, batch_size=ENA_XML_BATCH_SIZE):
+    """Given a list of accessions, retrieve their XML from ENA with one request
+    per batch of accessions, instead of one request per accession.
+
+    :param accessions: list of accessions
+    :type accessions: list
+    :param batch_size: maximum number of accessions per request
+    :type batch_size: int
+
+    :return: dictionary of accession to a BeautifulSoup object of its XML record.
+             Accessions that ENA did not return a record for are left out.
+    :rtype: dict
+    """
+    soups = {}
+    for i in range(0, len(accessions), batch_size):
+        batch = accessions[i : i + batch_size]
+        try:
+            soup = BeautifulSoup(
+                cached_get(f"{ENA_URL}/{','.join(batch)}"), features="lxml-xml"
+            )
+        except (FfqException, requests.RequestException) as exception:
+            logger.debug("Failed to fetch XML batch from ENA: %s", exception)
+            continue
+        record_set = soup.find(True)
+        if record_set is None:
+            continue
+        for record in record_set.find_all(True, recursive=False):
+            # Wrap each record in a document of its own, like the one returned
+            # by `get_xml` for a single accession
+            record_soup = BeautifulSoup("", features="lxml-xml")
+            record_set_copy = record_soup.new_tag(record_set.name)
+            record_soup.append(record_set_copy)
+            record_set_copy.append(record.extract())
+            soups[record.get("accession")] = record_soup
+    return soups
 
 
 def get_encode_json(accession):
@@ -101,12 +469,10 @@ def get_gse_search_json(accession):
     :param accession: an accession
     :type accession: str
 
-    :return: a BeautifulSoup object of the parsed JSON
-    :rtype: bs4.BeautifulSoup
+    :return: the parsed JSON
+    :rtype: dict
     """
-    return BeautifulSoup(
-        cached_get(f"{GSE_SEARCH_URL}{accession}{GSE_SEARCH_TERMS}"), "html.parser"
-    )
+    return json.loads(cached_get(f"{GSE_SEARCH_URL}{accession}{GSE_SEARCH_TERMS}"))
 
 
 def get_gsm_search_json(accession):
@@ -132,12 +498,10 @@ def get_gse_summary_json(accession):
     :param accession: an accession
     :type accession: str
 
-    :return: a BeautifulSoup object of the parsed JSON
-    :rtype: bs4.BeautifulSoup
+    :return: the parsed JSON
+    :rtype: dict
     """
-    return BeautifulSoup(
-        cached_get(f"{GSE_SUMMARY_URL}{accession}{GSE_SUMMARY_TERMS}"), "html.parser"
-    )
+    return json.loads(cached_get(f"{GSE_SUMMARY_URL}{accession}{GSE_SUMMARY_TERMS}"))
 
 
 def get_samples_from_study(accession):
@@ -151,15 +515,10 @@ def get_samples_from_study(accession):
     :rtype: list
     """
     soup = get_xml(accession)
-    samples_parsed = soup.find("ID", text=SAMPLE_PARSER)
+    samples_parsed = soup.find("ID", string=SAMPLE_PARSER)
     samples = []
     if samples_parsed:
-        samples_ranges = samples_parsed.text.split(",")
-        for sample_range in samples_ranges:
-            if "-" in sample_range:
-                samples += parse_range(sample_range)
-            else:
-                samples.append(sample_range)
+        samples = parse_ranges(samples_parsed.text)
     else:
         # The original code fell to ENA search if runs were not found. I don't know if this is
         # necessary, so make a warning to detect it in case it is.
@@ -174,14 +533,15 @@ def get_samples_from_study(accession):
             #     if len(samples) > 2:
             #         break
             soup = ena_fetch(srx, "sra")
-            time.sleep(0.5)
-            samples.append(soup.find("primary_id", text=SAMPLE_PARSER).text)
+            samples.append(soup.find("primary_id", string=SAMPLE_PARSER).text)
 
     if not samples:
         logger.warning("No samples found for study")
         return
 
-    return samples
+    # Several experiments may share a sample, so drop repeats (keeping the
+    # order) to fetch each sample once
+    return list(dict.fromkeys(samples))
 
 
 def parse_encode_biosample(data):
@@ -329,13 +689,36 @@ def parse_tsv(s):
              the header (first line of string)
     :rtype: list
     """
-    lines = s.strip().splitlines()
-    header = lines.pop(0).split("\t")
+    header, *lines = s.strip().splitlines()
+    header = header.split("\t")
+    return [dict(zip(header, line.split("\t"))) for line in lines]
+
+
+def parse_tsv_columns(s, columns):
+    """Parse only some of the columns of a TSV-formatted string into a list of
+    dictionaries.
+
+    :param s: TSV-formatted string
+    :type s: str
+    :param columns: names of the columns to keep
+    :type columns: list
+
+    :return: list of dictionaries, with each dictionary containing the requested
+             columns. Columns missing from the header are empty strings.
+    :rtype: list
+    """
+    header, *lines = s.strip().splitlines()
+    header = header.split("\t")
+    # Missing columns point one past the header, where rows are padded with ""
+    indices = [
+        header.index(column) if column in header else len(header) for column in columns
+    ]
 
     rows = []
     for line in lines:
         values = line.split("\t")
-        rows.append({key: value for key, value in zip(header, values)})
+        values += [""] * (len(header) + 1 - len(values))
+        rows.append({column: values[i] for column, i in zip(columns, indices)})
     return rows
 
 
@@ -509,13 +892,13 @@ def search_ena_title(title):
         sra_ids = ncbi_link("bioproject", "sra", ",".join(bioproject_ids))
 
         # Fetch summaries of these SRA ids
-        time.sleep(1)
-        sras = ncbi_summary("sra", ",".join(sra_ids))
+        sras = ncbi_summary("sra", sra_ids)
         srps.extend(SRP_PARSER.findall(str(sras)))
 
     return list(set(srps))
 
 
+@lru_cache(maxsize=1024)
 def ncbi_fetch_fasta(accession, db):
     """Fetch fastq files information from the
     specified NCBI entrez database for the specified
@@ -530,7 +913,7 @@ def ncbi_fetch_fasta(accession, db):
     :return: BeautifulSoup object with fastq files information
     :rtype: bs4.BeautifulSoup
     """
-    response = requests.get(
+    response = rate_limited_get(
         NCBI_FETCH_URL,
         params={
             "db": db,
@@ -541,13 +924,13 @@ def ncbi_fetch_fasta(accession, db):
     try:
         response.raise_for_status()
     except requests.HTTPError as exception:
-        logger.error(f"{exception}")
+        logger.error(exception)
         raise InvalidAccession("Provided accession is invalid")
     text = response.text
     if not text:
         raise BadData(f"No metadata found for {accession}")
     else:
-        return BeautifulSoup(response.content, "xml")
+        return BeautifulSoup(response.content, features="lxml-xml")
 
 
 def ncbi_summary(db, id):
@@ -556,26 +939,28 @@ def ncbi_summary(db, id):
 
     :param db: an entrez database
     :type db: str
-    :param id: database id, can be comma-delimited list of ids
-    :type id: str
+    :param id: database id, can be comma-delimited list of ids or a list of ids,
+               which are all summarized in a single request
+    :type id: str or list
 
     :return: dictionary of id-summary pairs
     :rtype: dict
     """
-    # TODO: use cached get. Can't be used currently because dictionaries can
-    # not be hashed.
-    response = requests.get(
+    text = cached_get(
         NCBI_SUMMARY_URL,
-        params={
-            "db": db,
-            "id": id,
-            "retmode": "json",
-            "retmax": 10000,  # maximum allowed
-        },
+        params=frozendict(
+            {
+                "db": db,
+                "id": id if isinstance(id, str) else ",".join(id),
+                "retmode": "json",
+                "retmax": 10000,  # maximum allowed
+            }
+        ),
     )
-    response.raise_for_status()
     return {
-        id: summary for id, summary in response.json()["result"].items() if id != "uids"
+        id: summary
+        for id, summary in json.loads(text)["result"].items()
+        if id != "uids"
     }
 
 
@@ -592,19 +977,18 @@ def ncbi_search(db, term):
     :return: list of ids that match the search
     :rtype: list
     """
-    # TODO: use cached get. Can't be used currently because dictionaries can
-    # not be hashed.
-    response = requests.get(
+    text = cached_get(
         NCBI_SEARCH_URL,
-        params={
-            "db": db,
-            "term": term,
-            "retmode": "json",
-            "retmax": 100000,  # max allowed
-        },
+        params=frozendict(
+            {
+                "db": db,
+                "term": term,
+                "retmode": "json",
+                "retmax": 100000,  # max allowed
+            }
+        ),
     )
-    response.raise_for_status()
-    return sorted(response.json().get("esearchresult", {}).get("idlist", []))
+    return sorted(json.loads(text).get("esearchresult", {}).get("idlist", []))
 
 
 def ncbi_link(origin, destination, id):
@@ -621,20 +1005,19 @@ def ncbi_link(origin, destination, id):
     :return: list of ids that match the search
     :rtype: list
     """
-    # TODO: use cached get. Can't be used currently because dictionaries can
-    # not be hashed.
-    response = requests.get(
+    text = cached_get(
         NCBI_LINK_URL,
-        params={
-            "dbfrom": origin,
-            "db": destination,
-            "id": id,
-            "retmode": "json",
-        },
+        params=frozendict(
+            {
+                "dbfrom": origin,
+                "db": destination,
+                "id": id,
+                "retmode": "json",
+            }
+        ),
     )
-    response.raise_for_status()
     ids = []
-    for linkset in response.json().get("linksets", []):
+    for linkset in json.loads(text).get("linksets", []):
         if linkset:
             for linksetdb in linkset.get("linksetdbs", {}):
                 ids.extend(linksetdb.get("links", []))
@@ -671,8 +1054,7 @@ def geo_id_to_srps(id):
     sra_ids = ncbi_link("bioproject", "sra", bioproject_id)
 
     # Fetch summaries of these SRA ids
-    time.sleep(1)
-    sras = ncbi_summary("sra", ",".join(sra_ids))
+    sras = ncbi_summary("sra", sra_ids)
     srps = list(set(SRP_PARSER.findall(str(sras))))
     return srps
 
@@ -697,9 +1079,7 @@ def gsm_id_to_srs(id):
         for srx in srxs:
             try:
                 soup = get_xml(srx)
-                sample = soup.find(
-                    re.compile(r"PRIMARY_ID|ID"), text=SAMPLE_PARSER
-                ).text
+                sample = soup.find(ID_TAG_PARSER, string=SAMPLE_PARSER).text
             except:  # noqa
                 logger.warning("No sample found")
                 return
@@ -720,11 +1100,10 @@ def geo_ids_to_gses(ids):
     :return: list of GSE accessions
     :rtype: list
     """
-    # TODO: use cached get. Can't be used currently because dictionaries can
-    # not be hashed.
-    response = requests.get(NCBI_FETCH_URL, params={"db": "gds", "id": ",".join(ids)})
-    response.raise_for_status()
-    return sorted(list(set(GSE_PARSER.findall(response.text))))
+    text = cached_get(
+        NCBI_FETCH_URL, params=frozendict({"db": "gds", "id": ",".join(ids)})
+    )
+    return sorted(list(set(GSE_PARSER.findall(text))))
 
 
 def sra_ids_to_srrs(ids):
@@ -736,11 +1115,10 @@ def sra_ids_to_srrs(ids):
     :return: list of SRR accessions
     :rtype: list
     """
-    # TODO: use cached get. Can't be used currently because dictionaries can
-    # not be hashed.
-    response = requests.get(NCBI_SUMMARY_URL, params={"db": "sra", "id": ",".join(ids)})
-    response.raise_for_status()
-    return sorted(list(set(SRR_PARSER.findall(response.text))))
+    text = cached_get(
+        NCBI_SUMMARY_URL, params=frozendict({"db": "sra", "id": ",".join(ids)})
+    )
+    return sorted(list(set(SRR_PARSER.findall(text))))
 
 
 def parse_range(text):
@@ -754,15 +1132,35 @@ def parse_range(text):
     """
 
     first, last = text.split("-")
-    base = re.match(r"^.*?(?=[0-9])", first).group(0)
+    base = ACCESSION_BASE_PARSER.match(first).group(0)
+    width = len(first) - len(base)
 
     ids = [
-        f"{base}{str(i).zfill(len(first) - len(base))}"
+        f"{base}{i:0{width}d}"
         for i in range(int(first[len(base) :]), int(last[len(base) :]) + 1)
     ]
     return ids
 
 
+def parse_ranges(text):
+    """Given a comma-separated string of accessions and accession ranges, returns
+    a list of all the accessions.
+
+    :param text: accessions and accession ranges (example: 'SRR1,SRR3-SRR5')
+    :type text: str
+
+    :return: a list of accessions, with ranges expanded
+    :rtype: list
+    """
+    ids = []
+    for accession_range in text.split(","):
+        if "-" in accession_range:
+            ids.extend(parse_range(accession_range))
+        else:
+            ids.append(accession_range)
+    return ids
+
+
 def geo_to_suppl(accession, GEO):
     """Retrieve supplemental files
     associated with a GEO ID.
@@ -773,18 +1171,42 @@ def geo_to_suppl(accession, GEO):
     :return: a list of dictionaries with supplemental file information
     :rtype: list
     """
+    try:
+        return list_geo_suppl(accession, GEO)
+    except ftp_errors as exception:
+        # Not memoized, so a later call for the same accession tries again
+        logger.warning(
+            "Failed to list supplementary files of %s: %s", accession, exception
+        )
+        return []
+
+
+@lru_cache(maxsize=1024)
+def list_geo_suppl(accession, GEO):
+    """List the supplemental files associated with a GEO ID on the GEO FTP
+    server. Listings are memoized, and errors other than a missing
+    supplementary directory are raised so that failed listings are not.
+    :param accession: GEO ID
+    :type id: str
+    :param GEO: Type of GEO entry, either GSM or GSE
+    :type id: str
+    :return: a list of dictionaries with supplemental file information
+    :rtype: list
+    """
 
     if GEO == "GSM":
         link = FTP_GEO_SAMPLE
     elif GEO == "GSE":
         link = FTP_GEO_SERIES
-    ftp = FTP(FTP_GEO_URL)
-    ftp.login()
     path = f"{link}{accession[:-3]}nnn/{accession}{FTP_GEO_SUPPL}"
-    try:
-        files = ftp.mlsd(path)
-    except:  # noqa
-        return []
+    RATE_LIMITERS[FTP_GEO_URL].wait()
+    with FTP(FTP_GEO_URL, timeout=REQUEST_TIMEOUT) as ftp:
+        ftp.login()
+        try:
+            files = list(ftp.mlsd(path))
+        except error_perm:
+            # The directory does not exist when there are no supplementary files
+            return []
     try:
         supp = []
         idx = 0
@@ -835,13 +1257,11 @@ def gse_to_gsms(accession):
     :return: a list of GSM ids
     :rtype: list
     """
-    data = json.loads(get_gse_search_json(accession).text)
+    data = get_gse_search_json(accession)
     if data["esearchresult"]["idlist"]:
         gse_id = data["esearchresult"]["idlist"][-1]
         gse = ncbi_summary("gds", gse_id)
-        gsms = [sample["accession"] for sample in gse[gse_id]["samples"]]
-        gsms.sort()
-        return gsms
+        return sorted({sample["accession"] for sample in gse[gse_id]["samples"]})
     else:
         raise InvalidAccession("Provided GSE accession is invalid")
 
@@ -864,15 +1284,10 @@ def gsm_to_srx(accession):
 
 def srp_to_srx(accession):
     soup = get_xml(accession)
-    experiments_parsed = soup.find("ID", text=EXPERIMENT_PARSER)
+    experiments_parsed = soup.find("ID", string=EXPERIMENT_PARSER)
     experiments = []
     if experiments_parsed:
-        experiments_ranges = experiments_parsed.text.split(",")
-        for experiments_range in experiments_ranges:
-            if "-" in experiments_range:
-                experiments += parse_range(experiments_range)
-            else:
-                experiments.append(experiments_range)
+        experiments = parse_ranges(experiments_parsed.text)
     else:
         # The original code fell to ENA search if runs were not found. I don't know if this is
         # necessary, so make a warning to detect it in case it is.
@@ -892,7 +1307,7 @@ def srs_to_srx(accession):
     :rtype: list
     """
     soup = get_xml(accession)
-    return soup.find("ID", text=EXPERIMENT_PARSER).text
+    return soup.find("ID", string=EXPERIMENT_PARSER).text
 
 
 def srx_to_srrs(accession):
@@ -905,14 +1320,9 @@ def srx_to_srrs(accession):
     """
     soup = get_xml(accession)
     runs = []
-    run_parsed = soup.find("ID", text=RUN_PARSER)
+    run_parsed = soup.find("ID", string=RUN_PARSER)
     if run_parsed:
-        run_ranges = run_parsed.text.split(",")
-        for run_range in run_ranges:
-            if "-" in run_range:
-                runs += parse_range(run_range)
-            else:
-                runs.append(run_range)
+        runs = parse_ranges(run_parsed.text)
     else:
         logger.warning(
             "Failed to parse experiment information from ENA XML. Falling back to "
@@ -929,80 +1339,121 @@ def srx_to_srrs(accession):
     return runs
 
 
-def get_files_metadata_from_run(soup):
+def get_file_reports(accession):
+    """Given an accession (run, experiment, sample or study), fetch the
+    ENA file report of all of its runs in a single request.
+
+    :param accession: an accession
+    :type accession: str
+
+    :return: dictionary of run accession to its row of the file report
+    :rtype: dict
+    """
+    try:
+        text = cached_get(
+            ENA_FILEREPORT_URL,
+            params=frozendict(
+                {
+                    "accession": accession,
+                    "result": "read_run",
+                    "fields": ",".join(ENA_FILEREPORT_FIELDS),
+                }
+            ),
+        )
+    except (FfqException, requests.RequestException) as exception:
+        # Runs without a row fall back to fetching their own file reports
+        logger.debug("Failed to fetch file report from ENA: %s", exception)
+        return {}
+    return {
+        row["run_accession"]: row
+        for row in parse_tsv_columns(text, ENA_FILEREPORT_FIELDS)
+    }
+
+
+def get_files_metadata_from_run(soup, file_report=None):
     """Given a BeautifulSoup object with
     SRR run metadata, returns list of
     dictionaries with metadata of associated files
     :param soup: a BeautifulSoup object with SRR metadata
     :type id: bs4.BeautifulSoup
+    :param file_report: the run's row of the ENA file report, as returned
+                        by `get_file_reports`, if it was already fetched,
+                        defaults to `None`
+    :type file_report: dict, optional
     :return: a list files metadata dictionaries
     :rtype: list
     """
-    accession = soup.find("PRIMARY_ID", text=RUN_PARSER).text
+    accession = soup.find("PRIMARY_ID", string=RUN_PARSER).text
+    if file_report is not None:
+        files = parse_file_report(accession, file_report, "fastq")
+        if "BAM" in file_report["submitted_format"]:
+            files.extend(parse_file_report(accession, file_report, "submitted"))
+        return files
+
+    # Map each database to its (first) link in a single pass over the links
+    xrefs = {}
+    for xref in soup.find_all("XREF_LINK"):
+        xrefs.setdefault(xref.find("DB").text, xref.find("ID").text)
+
     files = []
     # Get FASTQs if available
-    for xref in soup.find_all("XREF_LINK"):
-        if xref.find("DB").text == "ENA-FASTQ-FILES":
-            fastq_url = xref.find("ID").text
-            table = parse_tsv(cached_get(fastq_url))
-            assert len(table) == 1
-            urls = table[0].get("fastq_ftp", "")
-            md5s = table[0].get("fastq_md5", "")
-            sizes = table[0].get("fastq_bytes", "")
-            # If any of these are empty, that means no FASTQs are
-            # available. This usually means the data was submitted as a BAM file.
-            if not urls or not md5s or not sizes:
-                break
-
-            files.extend(
-                [
-                    {
-                        "accession": accession,
-                        "filename": url.split("/")[-1],
-                        "filetype": parse_url(url)[0],
-                        "filesize": int(size),
-                        "filenumber": parse_url(url)[1],
-                        "md5": md5,
-                        "urltype": "ftp",
-                        "url": f"ftp://{url}",
-                    }
-                    for url, md5, size in zip(
-                        urls.split(";"), md5s.split(";"), sizes.split(";")
-                    )
-                ]
-            )
-            break
+    fastq_url = xrefs.get("ENA-FASTQ-FILES")
+    if fastq_url:
+        table = parse_tsv_columns(
+            cached_get(fastq_url), ("fastq_ftp", "fastq_md5", "fastq_bytes")
+        )
+        assert len(table) == 1
+        # If any of the columns are empty, that means no FASTQs are
+        # available. This usually means the data was submitted as a BAM file.
+        files.extend(parse_file_report(accession, table[0], "fastq"))
     # Include BAM (in submitted file)
-    for xref in soup.find_all("XREF_LINK"):
-        if xref.find("DB").text == "ENA-SUBMITTED-FILES":
-            bam_url = xref.find("ID").text
-            table = parse_tsv(cached_get(bam_url))
-            assert len(table) == 1
-            urls = table[0].get("submitted_ftp", "")
-            md5s = table[0].get("submitted_md5", "")
-            sizes = table[0].get("submitted_bytes", "")
-            formats = table[0].get("submitted_format", "")
-            if not urls or not md5s or not sizes or "BAM" not in formats:
-                break
-            # print(urls)
-            files.extend(
-                [
-                    {
-                        "accession": accession,
-                        "filename": url.split("/")[-1],
-                        "filetype": parse_url(url)[0],
-                        "filesize": int(size),
-                        "filenumber": parse_url(url)[1],
-                        "md5": md5,
-                        "urltype": "ftp",
-                        "url": f"ftp://{url}",
-                    }
-                    for url, md5, size in zip(
-                        urls.split(";"), md5s.split(";"), sizes.split(";")
-                    )
-                ]
+    bam_url = xrefs.get("ENA-SUBMITTED-FILES")
+    if bam_url:
+        table = parse_tsv_columns(
+            cached_get(bam_url),
+            ("submitted_ftp", "submitted_md5", "submitted_bytes", "submitted_format"),
+        )
+        assert len(table) == 1
+        if "BAM" in table[0]["submitted_format"]:
+            files.extend(parse_file_report(accession, table[0], "submitted"))
+    return files
+
+
+def parse_file_report(accession, row, prefix):
+    """Given a row of an ENA file report, returns list of
+    dictionaries with metadata of the files in it
+
+    :param accession: run accession the files belong to
+    :type accession: str
+    :param row: a row of the file report, as returned by `parse_tsv_columns`
+    :type row: dict
+    :param prefix: prefix of the `_ftp`, `_md5` and `_bytes` columns to use,
+                   either `fastq` or `submitted`
+    :type prefix: str
+
+    :return: a list files metadata dictionaries, empty if any of the
+             columns are empty
+    :rtype: list
+    """
+    urls = row[f"{prefix}_ftp"]
+    md5s = row[f"{prefix}_md5"]
+    sizes = row[f"{prefix}_bytes"]
+    files = []
+    if urls and md5s and sizes:
+        for url, md5, size in zip(urls.split(";"), md5s.split(";"), sizes.split(";")):
+            filetype, filenumber = parse_url(url)
+            files.append(
+                {
+                    "accession": accession,
+                    "filename": url.rsplit("/", 1)[-1],
+                    "filetype": filetype,
+                    "filesize": int(size),
+                    "filenumber": filenumber,
+                    "md5": md5,
+                    "urltype": "ftp",
+                    "url": f"ftp://{url}",
+                }
             )
-            break
     return files
 
 
@@ -1059,10 +1510,23 @@ def parse_ncbi_fetch_fasta(soup, server):
     :rparam: list of urls
     :rtype: list
     """
-    links = []
+    return parse_ncbi_fetch_fasta_all(soup).get(server, [])
+
+
+def parse_ncbi_fetch_fasta_all(soup):
+    """Given the output of `ncbi_fetch_fasta`, returns the fastq or bam urls
+    grouped by the server hosting them, in a single pass over the soup.
+
+    :param soup: BeautifulSoup object (output of `ncbi_fetch_fasta`
+    with fastq information
+    :type: bs4.BeautifulSoup object
+
+    :return: dictionary of server (AWS, GCP or NCBI) to list of urls
+    :rtype: dict
+    """
+    links = {}
     for alternative in soup.find_all("Alternatives"):
-        if alternative.get("org") == server:
-            links.append(alternative.get("url"))
+        links.setdefault(alternative.get("org"), []).append(alternative.get("url"))
     return links
 
 
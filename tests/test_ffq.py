@@ -1,3 +1,4 @@
+import json
 import sys
 from io import StringIO
 from unittest import mock, TestCase
@@ -63,6 +64,12 @@ class TestFfq(TestMixin, TestCase):
                     "valid": True,
                     "error": None,
                 },
+                {
+                    "accession": "12345",
+                    "prefix": "UNKNOWN",
+                    "valid": False,
+                    "error": None,
+                },
             ],
             ffq.validate_accessions(
                 [
@@ -72,6 +79,7 @@ class TestFfq(TestMixin, TestCase):
                     "ASA10.1016/j.cell.2018.06.052",
                     "GSM12345",
                     "GSE567890",
+                    "12345",
                 ],
                 SEARCH_TYPES,
             ),
@@ -84,14 +92,14 @@ class TestFfq(TestMixin, TestCase):
         ) as get_files_metadata_from_run, mock.patch(
             "ffq.ffq.ncbi_fetch_fasta"
         ) as ncbi_fetch_fasta, mock.patch(
-            "ffq.ffq.parse_ncbi_fetch_fasta"
-        ) as parse_ncbi_fetch_fasta:
+            "ffq.ffq.parse_ncbi_fetch_fasta_all"
+        ) as parse_ncbi_fetch_fasta_all:
             with open(self.run_path, "r") as f:
                 soup = BeautifulSoup(f.read(), "xml")
 
             get_files_metadata_from_run.return_value = []
             ncbi_fetch_fasta.return_value = []
-            parse_ncbi_fetch_fasta.return_value = []
+            parse_ncbi_fetch_fasta_all.return_value = {}
             self.assertEqual(
                 {
                     "accession": "SRR8426358",
@@ -110,6 +118,27 @@ class TestFfq(TestMixin, TestCase):
                 ffq.parse_run(soup),
             )
 
+    def test_parse_run_file_report(self):
+        with mock.patch(
+            "ffq.ffq.get_files_metadata_from_run"
+        ) as get_files_metadata_from_run, mock.patch(
+            "ffq.ffq.ncbi_fetch_fasta"
+        ) as ncbi_fetch_fasta, mock.patch(
+            "ffq.ffq.parse_ncbi_fetch_fasta_all"
+        ) as parse_ncbi_fetch_fasta_all, mock.patch(
+            "ffq.ffq.map_concurrently"
+        ) as map_concurrently:
+            with open(self.run_path, "r") as f:
+                soup = BeautifulSoup(f.read(), "xml")
+
+            get_files_metadata_from_run.return_value = ["file"]
+            parse_ncbi_fetch_fasta_all.return_value = {}
+            report = {"run_accession": "SRR8426358"}
+            self.assertEqual(["file"], ffq.parse_run(soup, report)["files"]["ftp"])
+            get_files_metadata_from_run.assert_called_once_with(soup, report)
+            ncbi_fetch_fasta.assert_called_once_with("SRR8426358", "sra")
+            map_concurrently.assert_not_called()
+
     def test_parse_run_bam(self):
         with open(self.run2_path, "r") as f:
             soup = BeautifulSoup(f.read(), "xml")
@@ -360,16 +389,25 @@ class TestFfq(TestMixin, TestCase):
 
     def test_gse_search_json(self):
         with open(self.gse_search_path, "r") as f:
-            soup = BeautifulSoup(f.read(), "html.parser")
+            data = json.load(f)
             self.assertEqual(
                 {"accession": "GSE93374", "geo_id": "200093374"},
-                ffq.parse_gse_search(soup),
+                ffq.parse_gse_search(data),
             )
 
     def test_gse_summary_json(self):
         with open(self.gse_summary_path, "r") as f:
-            soup = BeautifulSoup(f.read(), "html.parser")
-            self.assertEqual({"accession": "SRP096361"}, ffq.parse_gse_summary(soup))
+            data = json.load(f)
+            self.assertEqual({"accession": "SRP096361"}, ffq.parse_gse_summary(data))
+
+    def test_parse_gse_summary_no_sra(self):
+        data = {
+            "result": {
+                "uids": ["200093374"],
+                "200093374": {"extrelations": [{"relationtype": "BioProject"}]},
+            }
+        }
+        self.assertIsNone(ffq.parse_gse_summary(data))
 
     def test_ffq_gse(self):
         # Need to figure out how to add for loop test for adding individual runs
@@ -418,7 +456,9 @@ class TestFfq(TestMixin, TestCase):
 
             get_gse_search_json.assert_called_once_with("GSE1")
             gse_to_gsms.assert_called_once_with("GSE1")
-            ffq_gsm.assert_has_calls([call("GSM_1", None), call("GSM_2", None)])
+            ffq_gsm.assert_has_calls(
+                [call("GSM_1", None), call("GSM_2", None)], any_order=True
+            )
 
     def test_ffq_gsm(self):
         # Need to figure out how to add for loop test for adding individual runs
@@ -469,8 +509,11 @@ class TestFfq(TestMixin, TestCase):
             "ffq.ffq.parse_study"
         ) as parse_study, mock.patch("ffq.ffq.ffq_sample") as ffq_sample, mock.patch(
             "ffq.ffq.get_samples_from_study"
-        ) as get_samples_from_study:
+        ) as get_samples_from_study, mock.patch(
+            "ffq.ffq.get_xml_many"
+        ) as get_xml_many:
             parse_study.return_value = {"study": "study_id"}
+            get_xml_many.return_value = {"sample_id1": "soup1"}
             get_samples_from_study.return_value = ["sample_id1", "sample_id2"]
             ffq_sample.side_effect = [{"accession": "id1"}, {"accession": "id2"}]
             self.assertEqual(
@@ -485,8 +528,39 @@ class TestFfq(TestMixin, TestCase):
             )
             get_xml.assert_called_once_with("SRP226764")
             self.assertEqual(2, ffq_sample.call_count)
+            get_xml_many.assert_called_once_with(["sample_id1", "sample_id2"])
             ffq_sample.assert_has_calls(
-                [call("sample_id1", None), call("sample_id2", None)]
+                [
+                    call("sample_id1", None, soup="soup1"),
+                    call("sample_id2", None, soup=None),
+                ],
+                any_order=True,
+            )
+
+    def test_ffq_sample(self):
+        with mock.patch("ffq.ffq.get_xml") as get_xml, mock.patch(
+            "ffq.ffq.parse_sample"
+        ) as parse_sample, mock.patch("ffq.ffq.ffq_experiment") as ffq_experiment:
+            parse_sample.return_value = {
+                "accession": "SRS1",
+                "experiments": "SRX1,SRX2",
+            }
+            ffq_experiment.side_effect = lambda accession, level: {
+                "accession": accession
+            }
+            self.assertEqual(
+                {
+                    "accession": "SRS1",
+                    "experiments": {
+                        "SRX1": {"accession": "SRX1"},
+                        "SRX2": {"accession": "SRX2"},
+                    },
+                },
+                ffq.ffq_sample("SRS1"),
+            )
+            get_xml.assert_called_once_with("SRS1")
+            ffq_experiment.assert_has_calls(
+                [call("SRX1", None), call("SRX2", None)], any_order=True
             )
 
     def test_ffq_experiment(self):
@@ -589,13 +663,22 @@ class TestFfq(TestMixin, TestCase):
             get_doi.return_value = {"title": ["title"]}
             search_ena_title.return_value = []
             ncbi_search.return_value = ["PMID1"]
-            ncbi_link.return_value = ["GEOID1"]
+            ncbi_link.side_effect = lambda origin, db, id: {
+                "gds": ["GEOID1"],
+                "sra": [],
+            }[db]
             geo_ids_to_gses.return_value = ["GSE1"]
             self.assertEqual([ffq_gse.return_value], ffq.ffq_doi("doi"))
             get_doi.assert_called_once_with("doi")
             search_ena_title.assert_called_once_with("title")
             ncbi_search.assert_called_once_with("pubmed", "doi")
-            ncbi_link.assert_called_once_with("pubmed", "gds", "PMID1")
+            ncbi_link.assert_has_calls(
+                [
+                    call("pubmed", "gds", "PMID1"),
+                    call("pubmed", "sra", "PMID1"),
+                ],
+                any_order=True,
+            )
             geo_ids_to_gses.assert_called_once_with(["GEOID1"])
             ffq_gse.assert_called_once_with("GSE1")
 
@@ -609,15 +692,20 @@ class TestFfq(TestMixin, TestCase):
         ) as ncbi_link, mock.patch(
             "ffq.ffq.sra_ids_to_srrs"
         ) as sra_ids_to_srrs, mock.patch(
+            "ffq.ffq.get_xml_many"
+        ) as get_xml_many, mock.patch(
             "ffq.ffq.ffq_run"
         ) as ffq_run:
 
             get_doi.return_value = {"title": ["title"]}
             search_ena_title.return_value = []
             ncbi_search.return_value = ["PMID1"]
-            ncbi_link.side_effect = [[], ["SRA1"]]
+            ncbi_link.side_effect = lambda origin, db, id: {
+                "gds": [],
+                "sra": ["SRA1"],
+            }[db]
             sra_ids_to_srrs.return_value = ["SRR1"]
-            ffq_run.return_value = {"accession": "SRR1", "study": {"accession": "SRP1"}}
+            ffq_run.return_value = {"accession": "SRR1", "study": "SRP1"}
             self.assertEqual(
                 [
                     {
@@ -625,7 +713,7 @@ class TestFfq(TestMixin, TestCase):
                         "runs": {
                             "SRR1": {
                                 "accession": "SRR1",
-                                "study": {"accession": "SRP1"},
+                                "study": "SRP1",
                             }
                         },
                     }
@@ -640,10 +728,14 @@ class TestFfq(TestMixin, TestCase):
                 [
                     call("pubmed", "gds", "PMID1"),
                     call("pubmed", "sra", "PMID1"),
-                ]
+                ],
+                any_order=True,
             )
             sra_ids_to_srrs.assert_called_once_with(["SRA1"])
-            ffq_run.assert_called_once_with("SRR1")
+            get_xml_many.assert_called_once_with(["SRR1"])
+            ffq_run.assert_called_once_with(
+                "SRR1", soup=get_xml_many.return_value.get.return_value
+            )
 
     def test_version_string(self):
         with patch("sys.argv", ["main", "--version"]):
@@ -7,6 +7,8 @@ import json
 import ffq.utils as utils
 from ffq.config import (
     CROSSREF_URL,
+    ENA_FILEREPORT_FIELDS,
+    ENA_FILEREPORT_URL,
     ENA_SEARCH_URL,
     ENA_URL,
     GSE_SEARCH_URL,
@@ -17,16 +19,178 @@ from ffq.config import (
     NCBI_LINK_URL,
     NCBI_SEARCH_URL,
     NCBI_SUMMARY_URL,
+    REQUEST_TIMEOUT,
 )
 from tests.mixins import TestMixin
 
 
 class TestUtils(TestMixin, TestCase):
     def test_cached_get(self):
-        with mock.patch("ffq.utils.requests") as requests:
-            self.assertEqual(requests.get().text, utils.cached_get())
+        with mock.patch("ffq.utils.SESSION") as session:
+            self.assertEqual(session.get().text, utils.cached_get("url"))
+
+    def test_cached_get_too_many_requests(self):
+        with mock.patch("ffq.utils.SESSION") as session:
+            response = session.get.return_value
+            response.status_code = 429
+            response.raise_for_status.side_effect = utils.requests.HTTPError(
+                response=response
+            )
+            with self.assertRaises(utils.ConnectionError):
+                utils.cached_get("too_many_url")
+
+    def test_cached_get_disk_cache(self):
+        import tempfile
+
+        tempdir = tempfile.mkdtemp()
+        with mock.patch("ffq.utils.SESSION") as session, mock.patch(
+            "ffq.utils.DISK_CACHE", utils.DiskCache(tempdir)
+        ):
+            session.get.return_value.text = "response"
+            session.get.return_value.headers = {}
+            self.assertEqual("response", utils.cached_get("disk_url"))
+            utils.cached_get.cache_clear()
+            session.get.return_value.text = "new response"
+            self.assertEqual("response", utils.cached_get("disk_url"))
+            session.get.assert_called_once_with("disk_url", timeout=REQUEST_TIMEOUT)
+
+    def test_cached_get_disk_cache_revalidate(self):
+        import tempfile
+
+        with mock.patch("ffq.utils.SESSION") as session, mock.patch(
+            "ffq.utils.DISK_CACHE", utils.DiskCache(tempfile.mkdtemp(), -1)
+        ):
+            session.get.return_value.text = "response"
+            session.get.return_value.headers = {"ETag": '"v1"'}
+            self.assertEqual("response", utils.cached_get("etag_url"))
+            utils.cached_get.cache_clear()
+            session.get.return_value.status_code = 304
+            session.get.return_value.text = ""
+            self.assertEqual("response", utils.cached_get("etag_url"))
+            session.get.assert_called_with(
+                "etag_url",
+                headers={"If-None-Match": '"v1"'},
+                timeout=REQUEST_TIMEOUT,
+            )
+
+    def test_disk_cache_expired(self):
+        import tempfile
+
+        cache = utils.DiskCache(tempfile.mkdtemp(), expire_after=-1)
+        cache.set("key", "value")
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual("value", cache.get("key", expire_after=60))
+        self.assertIsNone(cache.get("missing"))
+        self.assertIsNone(cache.get_stale("key"))
+        cache.set("key", "value", '"etag"')
+        self.assertEqual(("value", '"etag"'), cache.get_stale("key"))
+        # An interrupted update leaves the previous response without an ETag
+        with mock.patch.object(cache, "write", side_effect=OSError):
+            with self.assertRaises(OSError):
+                cache.set("key", "new value", '"new etag"')
+        self.assertIsNone(cache.get_stale("key"))
+        cache.set("key", "value", '"etag"')
+        cache.clear()
+        self.assertIsNone(cache.get("key", expire_after=60))
+        self.assertIsNone(cache.get_stale("key"))
+
+    def test_disk_cache_clear_keeps_other_files(self):
+        import os
+        import tempfile
+
+        directory = tempfile.mkdtemp()
+        cache = utils.DiskCache(directory)
+        cache.set("key", "value", '"etag"')
+        paths = [
+            f"{cache.path('key')}.123.456",
+            f"{cache.path('key')}.etag.123.456",
+            os.path.join(directory, "accessions.txt"),
+            os.path.join(directory, "notes.etag"),
+        ]
+        for path in paths:
+            with open(path, "w") as f:
+                f.write("text")
+        cache.clear()
+        self.assertEqual(
+            ["accessions.txt", "notes.etag"], sorted(os.listdir(directory))
+        )
+
+    def test_rate_limited_get(self):
+        with mock.patch("ffq.utils.SESSION.get") as get, mock.patch.dict(
+            "ffq.utils.RATE_LIMITERS", {"limited.org": mock.MagicMock()}
+        ) as limiters:
+            utils.rate_limited_get("https://limited.org/path", params={"id": 1})
+            limiters["limited.org"].wait.assert_called_once()
+            get.assert_called_once_with(
+                "https://limited.org/path",
+                params={"id": 1},
+                timeout=REQUEST_TIMEOUT,
+            )
+            utils.rate_limited_get("https://other.org/path", timeout=5)
+            limiters["limited.org"].wait.assert_called_once()
+            get.assert_called_with("https://other.org/path", timeout=5)
+
+    def test_rate_limiter(self):
+        with mock.patch("ffq.utils.time") as time:
+            time.monotonic.return_value = 0
+            limiter = utils.RateLimiter(2, capacity=2)
+            limiter.wait()
+            limiter.wait()
+            time.sleep.assert_not_called()
+            limiter.wait()
+            time.sleep.assert_called_once_with(0.5)
+            time.monotonic.return_value = 10
+            time.sleep.reset_mock()
+            limiter.wait()
+            time.sleep.assert_not_called()
+
+    def test_map_concurrently(self):
+        self.assertEqual(
+            [1, 4, 9, 16], utils.map_concurrently(lambda x: x * x, [1, 2, 3, 4])
+        )
+        self.assertEqual([], utils.map_concurrently(str, []))
+
+    def test_map_concurrently_nested(self):
+        import threading
+
+        # Passes only if all four inner items run at the same time
+        barrier = threading.Barrier(4, timeout=5)
+
+        def outer(item):
+            return utils.map_concurrently(lambda _: barrier.wait() is not None, [1, 2])
+
+        self.assertEqual(
+            [[True, True], [True, True]], utils.map_concurrently(outer, [1, 2])
+        )
+
+    def test_map_concurrently_bounded(self):
+        import threading
+        import time
+
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def leaf(item):
+            with lock:
+                running.append(item)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(item)
+            return item
+
+        def outer(item):
+            return utils.map_concurrently(leaf, range(10))
+
+        self.assertEqual(
+            [list(range(10))] * 10, utils.map_concurrently(outer, range(10))
+        )
+        # The pool threads, and the calling thread
+        self.assertLessEqual(max(peak), utils.MAX_WORKERS + 1)
 
     def test_get_xml(self):
+        utils.get_xml.cache_clear()
         with mock.patch("ffq.utils.cached_get") as cached_get:
             cached_get.return_value = """
             <TAGS>
@@ -38,19 +202,48 @@ class TestUtils(TestMixin, TestCase):
             cached_get.assert_called_once_with(f"{ENA_URL}/accession/")
             self.assertTrue(isinstance(result, BeautifulSoup))
 
+    def test_get_xml_many(self):
+        runs = []
+        for path in [self.run_path, self.run2_path]:
+            with open(path, "r") as f:
+                runs.append(f.read().split("<RUN_SET>")[1].split("</RUN_SET>")[0])
+        with mock.patch("ffq.utils.cached_get") as cached_get:
+            cached_get.return_value = f"<RUN_SET>{''.join(runs)}</RUN_SET>"
+            result = utils.get_xml_many(["SRR8426358", "SRR6835844"])
+            cached_get.assert_called_once_with(f"{ENA_URL}/SRR8426358,SRR6835844")
+            self.assertEqual(["SRR8426358", "SRR6835844"], list(result))
+            for accession, soup in result.items():
+                self.assertTrue(isinstance(soup, BeautifulSoup))
+                self.assertEqual("RUN_SET", soup.find(True).name)
+                self.assertEqual(1, len(soup.find_all("RUN")))
+                self.assertEqual(accession, soup.find("PRIMARY_ID").text)
+
+    def test_get_xml_many_batches(self):
+        with mock.patch("ffq.utils.cached_get") as cached_get:
+            cached_get.return_value = "<RUN_SET></RUN_SET>"
+            self.assertEqual({}, utils.get_xml_many(["SRR1", "SRR2", "SRR3"], 2))
+            cached_get.assert_has_calls(
+                [call(f"{ENA_URL}/SRR1,SRR2"), call(f"{ENA_URL}/SRR3")]
+            )
+
+    def test_get_xml_many_timeout(self):
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.side_effect = utils.requests.Timeout()
+            self.assertEqual({}, utils.get_xml_many(["SRR_TIMEOUT1", "SRR_TIMEOUT2"]))
+
     def test_get_gse_search_json(self):
         with mock.patch("ffq.utils.cached_get") as cached_get:
             cached_get.return_value = """
             {
-                {key1:value1},
-                {key2:value2}
+                "key1": "value1",
+                "key2": "value2"
             }
             """
             result = utils.get_gse_search_json("accession")
             cached_get.assert_called_once_with(
                 f"{GSE_SEARCH_URL}accession{GSE_SEARCH_TERMS}"
             )
-            self.assertTrue(isinstance(result, BeautifulSoup))
+            self.assertEqual({"key1": "value1", "key2": "value2"}, result)
 
     def test_get_gsm_search_json(self):
         with mock.patch("ffq.utils.ncbi_search") as ncbi_search:
@@ -64,15 +257,15 @@ class TestUtils(TestMixin, TestCase):
         with mock.patch("ffq.utils.cached_get") as cached_get:
             cached_get.return_value = """
             {
-                {key1:value1},
-                {key2:value2}
+                "key1": "value1",
+                "key2": "value2"
             }
             """
             result = utils.get_gse_summary_json("accession")
             cached_get.assert_called_once_with(
                 f"{GSE_SUMMARY_URL}accession{GSE_SUMMARY_TERMS}"
             )
-            self.assertTrue(isinstance(result, BeautifulSoup))
+            self.assertEqual({"key1": "value1", "key2": "value2"}, result)
 
     def test_get_samples_from_study(self):
         self.assertEqual(
@@ -90,6 +283,13 @@ class TestUtils(TestMixin, TestCase):
             utils.get_samples_from_study("SRP194123"),
         )
 
+    def test_get_samples_from_study_duplicates(self):
+        with mock.patch("ffq.utils.get_xml") as get_xml:
+            get_xml.return_value = BeautifulSoup(
+                "<STUDY><ID>SRS2,SRS1-SRS2</ID></STUDY>", "xml"
+            )
+            self.assertEqual(["SRS2", "SRS1"], utils.get_samples_from_study("SRP1"))
+
     def test_parse_encode_biosample(self):
         with open(self.biosample_path, "r") as f:
             biosample = json.loads(f.read())
@@ -169,6 +369,16 @@ class TestUtils(TestMixin, TestCase):
             utils.parse_tsv(s),
         )
 
+    def test_parse_tsv_columns(self):
+        s = "header1\theader2\theader3\nvalue1\tvalue2\tvalue3\nvalue4\tvalue5"
+        self.assertEqual(
+            [
+                {"header3": "value3", "header1": "value1", "missing": ""},
+                {"header3": "", "header1": "value4", "missing": ""},
+            ],
+            utils.parse_tsv_columns(s, ["header3", "header1", "missing"]),
+        )
+
     def test_get_doi(self):
         with mock.patch("ffq.utils.cached_get") as cached_get:
             cached_get.return_value = """{
@@ -246,11 +456,28 @@ class TestUtils(TestMixin, TestCase):
                 },
             )
 
+    def test_ncbi_fetch_fasta_cached(self):
+        utils.ncbi_fetch_fasta.cache_clear()
+        with mock.patch("ffq.utils.rate_limited_get") as rate_limited_get:
+            rate_limited_get.return_value.text = "<Run/>"
+            rate_limited_get.return_value.content = b"<Run/>"
+            first = utils.ncbi_fetch_fasta("SRR1", "sra")
+            second = utils.ncbi_fetch_fasta("SRR1", "sra")
+            self.assertIs(first, second)
+            rate_limited_get.assert_called_once()
+        utils.ncbi_fetch_fasta.cache_clear()
+
     def test_ncbi_summary(self):
-        with mock.patch("ffq.utils.requests.get") as get:
-            get.return_value.json.return_value = {
-                "result": {"uids": ["id1", "id2"], "id1": "summary1", "id2": "summary2"}
-            }
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.return_value.text = json.dumps(
+                {
+                    "result": {
+                        "uids": ["id1", "id2"],
+                        "id1": "summary1",
+                        "id2": "summary2",
+                    }
+                }
+            )
             self.assertEqual(
                 {
                     "id1": "summary1",
@@ -266,13 +493,37 @@ class TestUtils(TestMixin, TestCase):
                     "retmode": "json",
                     "retmax": 10000,
                 },
+                timeout=REQUEST_TIMEOUT,
+            )
+
+    def test_ncbi_summary_list(self):
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.return_value.text = json.dumps(
+                {
+                    "result": {
+                        "uids": ["id1", "id2"],
+                        "id1": "summary1",
+                        "id2": "summary2",
+                    }
+                }
+            )
+            utils.ncbi_summary("db", ["id1", "id2"])
+            get.assert_called_once_with(
+                NCBI_SUMMARY_URL,
+                params={
+                    "db": "db",
+                    "id": "id1,id2",
+                    "retmode": "json",
+                    "retmax": 10000,
+                },
+                timeout=REQUEST_TIMEOUT,
             )
 
     def test_ncbi_search(self):
-        with mock.patch("ffq.utils.requests.get") as get:
-            get.return_value.json.return_value = {
-                "esearchresult": {"idlist": ["id1", "id2"]}
-            }
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.return_value.text = json.dumps(
+                {"esearchresult": {"idlist": ["id1", "id2"]}}
+            )
             self.assertEqual(["id1", "id2"], utils.ncbi_search("db", "term"))
             get.assert_called_once_with(
                 NCBI_SEARCH_URL,
@@ -282,13 +533,14 @@ class TestUtils(TestMixin, TestCase):
                     "retmode": "json",
                     "retmax": 100000,
                 },
+                timeout=REQUEST_TIMEOUT,
             )
 
     def test_ncbi_link(self):
-        with mock.patch("ffq.utils.requests.get") as get:
-            get.return_value.json.return_value = {
-                "linksets": [{"linksetdbs": [{"links": ["id1", "id2"]}]}]
-            }
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.return_value.text = json.dumps(
+                {"linksets": [{"linksetdbs": [{"links": ["id1", "id2"]}]}]}
+            )
             self.assertEqual(
                 ["id1", "id2"], utils.ncbi_link("origin", "destination", "id")
             )
@@ -300,6 +552,7 @@ class TestUtils(TestMixin, TestCase):
                     "id": "id",
                     "retmode": "json",
                 },
+                timeout=REQUEST_TIMEOUT,
             )
 
     def test_geo_id_to_srps(self):
@@ -334,12 +587,14 @@ class TestUtils(TestMixin, TestCase):
             ncbi_link.return_value = ["SRA1", "SRA2"]
             self.assertEqual(["SRP1"], utils.geo_id_to_srps("id"))
             self.assertEqual(2, ncbi_summary.call_count)
-            ncbi_summary.assert_has_calls([call("gds", "id"), call("sra", "SRA1,SRA2")])
+            ncbi_summary.assert_has_calls(
+                [call("gds", "id"), call("sra", ["SRA1", "SRA2"])]
+            )
             ncbi_search.assert_called_once_with("bioproject", "PRJNA1[PRJA]")
             ncbi_link.assert_called_once_with("bioproject", "sra", "BIOPROJECT1")
 
     def test_geo_ids_to_gses(self):
-        with mock.patch("ffq.utils.requests.get") as get:
+        with mock.patch("ffq.utils.SESSION.get") as get:
             get.return_value.text = (
                 "Series\t\tAccession: GSE1\tSeries\t\tAccession: GSE2\t"
             )
@@ -350,10 +605,11 @@ class TestUtils(TestMixin, TestCase):
                     "db": "gds",
                     "id": "id1,id2",
                 },
+                timeout=REQUEST_TIMEOUT,
             )
 
     def test_sra_ids_to_srrs(self):
-        with mock.patch("ffq.utils.requests.get") as get:
+        with mock.patch("ffq.utils.SESSION.get") as get:
             get.return_value.text = 'Run acc="SRR1" Run acc="SRR2"'
             self.assertEqual(["SRR1", "SRR2"], utils.sra_ids_to_srrs(["id1", "id2"]))
             get.assert_called_once_with(
@@ -362,6 +618,7 @@ class TestUtils(TestMixin, TestCase):
                     "db": "sra",
                     "id": "id1,id2",
                 },
+                timeout=REQUEST_TIMEOUT,
             )
 
     def test_parse_range_srr(self):
@@ -380,6 +637,39 @@ class TestUtils(TestMixin, TestCase):
             ["SRR01", "SRR02", "SRR03", "SRR04", "SRR05"], utils.parse_range(text)
         )
 
+    def test_parse_ranges(self):
+        text = "SRR1,SRR08-SRR10,SRR20"
+        self.assertEqual(
+            ["SRR1", "SRR08", "SRR09", "SRR10", "SRR20"], utils.parse_ranges(text)
+        )
+
+    def test_geo_to_suppl_failure_not_cached(self):
+        utils.list_geo_suppl.cache_clear()
+        with mock.patch("ffq.utils.FTP") as FTP, mock.patch.dict(
+            "ffq.utils.RATE_LIMITERS", {utils.FTP_GEO_URL: mock.MagicMock()}
+        ):
+            ftp = FTP.return_value.__enter__.return_value
+            ftp.mlsd.side_effect = EOFError()
+            self.assertEqual([], utils.geo_to_suppl("GSM12345", "GSM"))
+            ftp.mlsd.side_effect = None
+            ftp.mlsd.return_value = [
+                ("GSM12345.CEL.gz", {"type": "file", "size": "10"}),
+                (".", {"type": "cdir"}),
+            ]
+            self.assertEqual(
+                ["GSM12345.CEL.gz"],
+                [f["filename"] for f in utils.geo_to_suppl("GSM12345", "GSM")],
+            )
+            ftp.mlsd.side_effect = utils.error_perm("550 No such directory")
+            self.assertEqual([], utils.geo_to_suppl("GSM2", "GSM"))
+            self.assertEqual(3, ftp.mlsd.call_count)
+            # Only successful listings are memoized
+            utils.geo_to_suppl("GSM12345", "GSM")
+            utils.geo_to_suppl("GSM2", "GSM")
+            self.assertEqual(3, ftp.mlsd.call_count)
+            FTP.return_value.__exit__.assert_called()
+        utils.list_geo_suppl.cache_clear()
+
     def test_geo_to_suppl(self):
         self.assertEqual(
             [
@@ -438,13 +728,12 @@ class TestUtils(TestMixin, TestCase):
         with mock.patch(
             "ffq.utils.get_gse_search_json"
         ) as get_gse_search_json, mock.patch("ffq.utils.ncbi_summary") as ncbi_summary:
-            get_gse_search_json.return_value = BeautifulSoup(
+            get_gse_search_json.return_value = json.loads(
                 """{"header":{"type":"esearch","version":"0.3"},"esearchresult":{
                     "count":"16","retmax":"1","retstart":"0","idlist":["200128889"],
                     "translationset":[],"translationstack":[{"term":"GSE128889[GEO Accession]",
                     "field":"GEO Accession","count":"16","explode":"N"},"GROUP"],
-                    "querytranslation":"GSE128889[GEO Accession]"}}\n""",
-                "html.parser",
+                    "querytranslation":"GSE128889[GEO Accession]"}}\n"""
             )
 
             ncbi_summary.return_value = {
@@ -513,6 +802,51 @@ class TestUtils(TestMixin, TestCase):
             utils.srx_to_srrs("SRX5763720"),
         )
 
+    def test_get_file_reports(self):
+        with open(self.fastqs_path, "r") as f, mock.patch(
+            "ffq.utils.cached_get"
+        ) as cached_get:
+            cached_get.return_value = f.read()
+            reports = utils.get_file_reports("SRX5234128")
+        self.assertEqual(["SRR8426358"], list(reports))
+        self.assertEqual("5507959060;7194107512", reports["SRR8426358"]["fastq_bytes"])
+        self.assertEqual("", reports["SRR8426358"]["submitted_format"])
+        cached_get.assert_called_once_with(
+            ENA_FILEREPORT_URL,
+            params={
+                "accession": "SRX5234128",
+                "result": "read_run",
+                "fields": ",".join(ENA_FILEREPORT_FIELDS),
+            },
+        )
+
+    def test_get_file_reports_failure(self):
+        with mock.patch("ffq.utils.cached_get") as cached_get:
+            for exception in [
+                utils.InvalidAccession("invalid"),
+                utils.ConnectionError("429"),
+                utils.BadData("empty"),
+            ]:
+                cached_get.side_effect = exception
+                self.assertEqual({}, utils.get_file_reports("SRX5234128"))
+
+    def test_get_file_reports_timeout(self):
+        with mock.patch("ffq.utils.SESSION.get") as get:
+            get.side_effect = utils.requests.Timeout()
+            self.assertEqual({}, utils.get_file_reports("SRX_TIMEOUT"))
+
+    def test_get_files_metadata_from_run_file_report(self):
+        with open(self.run_path, "r") as f:
+            soup = BeautifulSoup(f.read(), "xml")
+        with open(self.fastqs_path, "r") as f:
+            report = utils.parse_tsv_columns(f.read(), ENA_FILEREPORT_FIELDS)[0]
+        with mock.patch("ffq.utils.cached_get") as cached_get:
+            self.assertEqual(
+                utils.parse_file_report("SRR8426358", report, "fastq"),
+                utils.get_files_metadata_from_run(soup, report),
+            )
+            cached_get.assert_not_called()
+
     def test_get_files_metadata_from_run(self):
         # TODO adjust links accordingly
         with open(self.run_path, "r") as f:
@@ -562,6 +896,40 @@ class TestUtils(TestMixin, TestCase):
             utils.get_files_metadata_from_run(soup),
         )
 
+    def test_parse_file_report(self):
+        row = {
+            "fastq_ftp": "ftp.sra.ebi.ac.uk/SRR1_1.fastq.gz;ftp.sra.ebi.ac.uk/SRR1_2.fastq.gz",
+            "fastq_md5": "md5_1;md5_2",
+            "fastq_bytes": "10;20",
+        }
+        self.assertEqual(
+            [
+                {
+                    "accession": "SRR1",
+                    "filename": "SRR1_1.fastq.gz",
+                    "filetype": "fastq",
+                    "filesize": 10,
+                    "filenumber": 1,
+                    "md5": "md5_1",
+                    "urltype": "ftp",
+                    "url": "ftp://ftp.sra.ebi.ac.uk/SRR1_1.fastq.gz",
+                },
+                {
+                    "accession": "SRR1",
+                    "filename": "SRR1_2.fastq.gz",
+                    "filetype": "fastq",
+                    "filesize": 20,
+                    "filenumber": 2,
+                    "md5": "md5_2",
+                    "urltype": "ftp",
+                    "url": "ftp://ftp.sra.ebi.ac.uk/SRR1_2.fastq.gz",
+                },
+            ],
+            utils.parse_file_report("SRR1", row, "fastq"),
+        )
+        row["fastq_md5"] = ""
+        self.assertEqual([], utils.parse_file_report("SRR1", row, "fastq"))
+
     def test_parse_url(self):
         self.assertEqual(
             ("fastq", 1),
@@ -581,6 +949,15 @@ class TestUtils(TestMixin, TestCase):
             utils.parse_ncbi_fetch_fasta(soup, "AWS"),
         )
 
+    def test_parse_ncbi_fetch_fasta_all(self):
+        with open(self.alt_links, "r") as f:
+            soup = BeautifulSoup(f.read(), "xml")
+        links = utils.parse_ncbi_fetch_fasta_all(soup)
+        for server in ["AWS", "GCP", "NCBI"]:
+            self.assertEqual(
+                utils.parse_ncbi_fetch_fasta(soup, server), links.get(server, [])
+            )
+
     def test_parse_bioproject(self):
         with open(self.bioproject_path, "r") as f:
             soup = BeautifulSoup(f.read(), "xml")